@@ -109,43 +109,55 @@ export class AllSensorsTable {
     const allKeys = Object.keys(data).sort((a,b) => a.localeCompare(b));
     const fragment = document.createDocumentFragment();
 
-    for (const key of allKeys) {
-      const tr = document.createElement('tr');
-      tr.dataset.key = key;
-
-      const nameTd = document.createElement('td');
-      const valueTd = document.createElement('td');
-      valueTd.className = 'value';
-
-      const hideBtn = document.createElement('button');
-      hideBtn.className = 'hide-btn';
-      hideBtn.dataset.action = 'hide';
-      hideBtn.dataset.key = key;
-      hideBtn.title = '숨기기';
-      hideBtn.textContent = '−';
-
-      const unhideBtn = document.createElement('button');
-      unhideBtn.className = 'unhide-btn';
-      unhideBtn.dataset.action = 'unhide';
-      unhideBtn.dataset.key = key;
-      unhideBtn.title = '보이기';
-      unhideBtn.textContent = '+';
-      
-      const nameSpan = document.createElement('span');
-      nameSpan.textContent = key;
-      
-      nameTd.append(hideBtn, unhideBtn, nameSpan);
-      tr.append(nameTd, valueTd);
-      fragment.appendChild(tr);
-
-      // 생성된 DOM 요소들의 참조를 Map에 저장하여 재사용
-      this.rows.set(key, { tr, valueTd, hideBtn, unhideBtn, lastVal: undefined });
-    }
+    for (const key of allKeys) fragment.appendChild(this.createRow(key));
     this.body.appendChild(fragment);
     this.isInitialized = true;
     this.resortRows(); // 초기 정렬 적용
     this.applyVisibility(); // 초기 숨김 상태 적용
   }
+
+  // 키 하나에 대한 행(DOM)을 만들어 Map에 등록하는 함수
+  createRow(key) {
+    const tr = document.createElement('tr');
+    tr.dataset.key = key;
+
+    const nameTd = document.createElement('td');
+    const valueTd = document.createElement('td');
+    valueTd.className = 'value';
+
+    const hideBtn = document.createElement('button');
+    hideBtn.className = 'hide-btn';
+    hideBtn.dataset.action = 'hide';
+    hideBtn.dataset.key = key;
+    hideBtn.title = '숨기기';
+    hideBtn.textContent = '−';
+
+    const unhideBtn = document.createElement('button');
+    unhideBtn.className = 'unhide-btn';
+    unhideBtn.dataset.action = 'unhide';
+    unhideBtn.dataset.key = key;
+    unhideBtn.title = '보이기';
+    unhideBtn.textContent = '+';
+    
+    const nameSpan = document.createElement('span');
+    nameSpan.textContent = key;
+    
+    nameTd.append(hideBtn, unhideBtn, nameSpan);
+    tr.append(nameTd, valueTd);
+
+    // 생성된 DOM 요소들의 참조를 Map에 저장하여 재사용
+    this.rows.set(key, { tr, valueTd, hideBtn, unhideBtn, lastVal: undefined });
+    return tr;
+  }
+
+  // 채널 그룹 노드가 따로 도착하므로, 처음 보는 키는 나중에 행을 추가
+  addMissingRows(data) {
+    const missing = Object.keys(data).filter(k => !this.rows.has(k));
+    if (missing.length === 0) return;
+    for (const key of missing) this.body.appendChild(this.createRow(key));
+    this.resortRows();
+    this.applyVisibility();
+  }
   
   // '중요 키 우선' 토글에 따라 행의 순서를 재정렬하는 함수
   resortRows() {
@@ -193,10 +205,13 @@ export class AllSensorsTable {
   // 데이터 업데이트 시 호출되는 메인 함수 (성능 개선의 핵심)
   update(data) {
     if (!data || this.toggleFreeze.checked) return;
-    this.lastSnapshot = data;
+    // 그룹 노드는 일부 키만 오므로 누적해서 보관 (Copy JSON 용)
+    this.lastSnapshot = Object.assign(this.lastSnapshot || {}, data);
 
     if (!this.isInitialized) {
       this.initTable(data);
+    } else {
+      this.addMissingRows(data);
     }
 
     // 모든 데이터 키에 대해 반복
@@ -38,11 +38,19 @@ FIREBASE_ENABLE = True
 # 웹 호환을 위한 레거시 실시간 경로
 LEGACY_REALTIME_KEY = "emu_realtime_data"   # ← 모듈화 전과 동일
 
+# 채널 그룹별 실시간 노드 루트 (emu_realtime/fast|medium|slow)
+REALTIME_ROOT = "emu_realtime"
+
+# 레거시 병합 노드(emu_realtime_data)에도 같은 값을 함께 기록할지 여부
+# (그룹 노드를 구독하지 않는 기존 웹 페이지 호환용, REALTIME_MIRROR_INTERVAL 주기로만 기록)
+REALTIME_LEGACY_MIRROR = True
+
 # 시계열 저장 루트(예전 스크립트 일부가 /logs 사용)
 TIMESERIES_ROOT = "/logs"
 
 # 경로 매핑
-# - 실시간(CAN/GPS/ACC)은 전부 emu_realtime_data로 병합 패치
+# - 실시간은 채널 그룹별 노드(emu_realtime/*)로 업로드, 필요 시 emu_realtime_data에 미러
+# - 워커 직접 업로드(fb 전달 시)는 기존대로 emu_realtime_data로 병합 패치
 # - 시계열은 필요 시 /logs/* 로 보관(웹 호환엔 영향 없음)
 FB_PATHS = {
     # 실시간(모두 같은 노드로 병합 → 웹과 완전 호환)
@@ -51,12 +59,147 @@ FB_PATHS = {
     "GPS_REALTIME":    f"/{LEGACY_REALTIME_KEY}",
     "ACC_REALTIME":    f"/{LEGACY_REALTIME_KEY}",
 
+    # 채널 그룹별 실시간 노드
+    "REALTIME_FAST":   f"/{REALTIME_ROOT}/fast",
+    "REALTIME_MEDIUM": f"/{REALTIME_ROOT}/medium",
+    "REALTIME_SLOW":   f"/{REALTIME_ROOT}/slow",
+
     # 시계열(원하면 대시보드에서 활용 가능; 웹 호환 필수는 아님)
     "CAN_TIMESERIES": f"{TIMESERIES_ROOT}/can",
     "GPS_TIMESERIES": f"{TIMESERIES_ROOT}/gps",
     "ACC_TIMESERIES": f"{TIMESERIES_ROOT}/acc",
 }
 
+# ===================== 채널(슬롯 매핑) =================
+# 상태 저장소(state_store)는 아래 순서대로 슬롯 번호를 고정 할당한다.
+# CSV 컬럼 순서도 동일(Timestamp 다음에 GPS → CAN → ACC).
+GPS_CHANNELS = (
+    "Latitude", "Longitude", "GPS_Speed_KPH", "Satellites", "Altitude_m", "Heading_deg",
+)
+CAN_CHANNELS = (
+    "RPM", "TPS_percent", "IAT_C", "MAP_kPa", "PulseWidth_ms",
+    "AnalogIn1_V", "AnalogIn2_V", "AnalogIn3_V", "AnalogIn4_V",
+    "VSS_kmh", "Baro_kPa", "OilTemp_C", "OilPressure_bar", "FuelPressure_bar", "CLT_C",
+    "IgnAngle_deg", "DwellTime_ms", "WBO_Lambda", "LambdaCorrection_percent", "EGT1_C", "EGT2_C",
+    "Gear", "EmuTemp_C", "Batt_V", "CEL_Error", "Flags1", "Ethanol_percent",
+    "DBW_Pos_percent", "DBW_Target_percent", "TC_drpm_raw", "TC_drpm",
+    "TC_TorqueReduction_percent", "PitLimit_TorqueReduction_percent",
+    "AnalogIn5_V", "AnalogIn6_V", "OutFlags1", "OutFlags2", "OutFlags3", "OutFlags4",
+    "BoostTarget_kPa", "PWM1_DC_percent", "DSG_Mode", "LambdaTarget", "PWM2_DC_percent", "FuelUsed_L",
+)
+ACC_CHANNELS = ("ax_g", "ay_g", "az_g")
+
+# ===================== 파생 채널 =================
+# kind 별 구현은 derived.py 참고. inputs 순서는 kind가 기대하는 순서와 같아야 함
+# - gear:    (RPM, 속도) → RPM/속도 비를 GEAR_RPM_PER_KMH 와 비교해 가장 가까운 단(범위 밖이면 0)
+# - rotate:  (ax, ay) → 장착 yaw 만큼 회전한 차량 좌표계 성분(axis: long/lat)
+# - rate:    (x,) → 값이 바뀐 시점 사이의 dx/dt * scale
+#            quantum = 입력 분해능. hold 계산 시 |출력| 을 quantum/(바뀐 뒤 경과 시간) 이하로 제한
+# - pw_fuel: (PulseWidth_ms, RPM) → 인젝터 유량 기반 순간 연료 소모(L/h)
+# 공통: tau_s = 1차 저역통과 시정수(초, 갱신 간격과 무관), hold_s = 입력이 이 시간 동안
+#       바뀌지 않아도 한 번 계산(rate 가 정지 후 0으로 수렴하도록)
+GEAR_RPM_PER_KMH = (115.0, 85.0, 68.0, 57.0, 50.0, 45.0)   # 실차 데이터로 보정 필요
+ACCEL_MOUNT_YAW_DEG = 0.0                                  # 센서 x축 → 차량 전방 회전각
+INJECTOR_FLOW_CC_MIN = 250.0
+INJECTOR_DEAD_TIME_MS = 0.5
+ENGINE_CYLINDERS = 4
+
+DERIVED_CHANNELS = (
+    {"name": "Gear_calc", "kind": "gear", "inputs": ("RPM", "VSS_kmh"),
+     "ratios": GEAR_RPM_PER_KMH, "min_kmh": 5.0, "tolerance": 0.12},
+    {"name": "LongG", "kind": "rotate", "inputs": ("ax_g", "ay_g"),
+     "axis": "long", "yaw_deg": ACCEL_MOUNT_YAW_DEG, "tau_s": 0.1},
+    {"name": "LatG", "kind": "rotate", "inputs": ("ax_g", "ay_g"),
+     "axis": "lat", "yaw_deg": ACCEL_MOUNT_YAW_DEG, "tau_s": 0.1},
+    {"name": "FuelRate_Lph", "kind": "rate", "inputs": ("FuelUsed_L",),
+     "scale": 3600.0, "tau_s": 2.0, "hold_s": 5.0, "quantum": 0.01},
+    {"name": "FuelRatePW_Lph", "kind": "pw_fuel", "inputs": ("PulseWidth_ms", "RPM"),
+     "flow_cc_min": INJECTOR_FLOW_CC_MIN, "dead_time_ms": INJECTOR_DEAD_TIME_MS,
+     "cylinders": ENGINE_CYLINDERS, "tau_s": 0.3},
+    {"name": "GPS_LongAccel_g", "kind": "rate", "inputs": ("GPS_Speed_KPH",),
+     "scale": 1 / 3.6 / 9.80665, "tau_s": 1.0, "hold_s": 1.5},
+)
+DERIVED_CHANNEL_NAMES = tuple(d["name"] for d in DERIVED_CHANNELS)
+
+ALL_CHANNELS = GPS_CHANNELS + CAN_CHANNELS + ACC_CHANNELS + DERIVED_CHANNEL_NAMES
+
+# ===================== 실시간 채널 그룹 =================
+# interval: 업로드 주기(초), None = 값이 바뀔 때만 (변경된 채널만 전송)
+# medium = fast/slow에 없는 나머지 전부
+_FAST_CHANNELS = (
+    "RPM", "TPS_percent", "MAP_kPa", "VSS_kmh", "DBW_Pos_percent", "DBW_Target_percent",
+    "WBO_Lambda", "TC_drpm", "ax_g", "ay_g", "az_g", "LongG", "LatG",
+)
+_SLOW_CHANNELS = (
+    "Gear", "CEL_Error", "Flags1", "OutFlags1", "OutFlags2", "OutFlags3", "OutFlags4",
+    "DSG_Mode", "Ethanol_percent", "FuelUsed_L", "Satellites", "Gear_calc",
+)
+REALTIME_GROUPS = {
+    "fast":   {"interval": 0.1, "channels": _FAST_CHANNELS},
+    "medium": {"interval": 1.0, "channels": tuple(
+        c for c in ALL_CHANNELS if c not in _FAST_CHANNELS and c not in _SLOW_CHANNELS)},
+    "slow":   {"interval": None, "channels": _SLOW_CHANNELS},
+}
+REALTIME_TICK_SEC = 0.05          # 업로더 루프 주기(변경 감지 포함)
+REALTIME_SLOW_RETRY_SEC = 1.0     # 변경 시 그룹 전송 실패 후 재시도 간격(링크 등급 배율 적용)
+REALTIME_MIRROR_INTERVAL = 0.2    # 레거시 노드 미러 주기(모든 그룹 값을 모아 한 번에, 모듈화 전과 동일)
+
+# ===================== 세션 인덱스 =================
+# 로그 CSV 옆에 <파일명>.idx (JSON Lines) 사이드카를 기록
+# - 블록(INDEX_BLOCK_ROWS 행)마다 시작 바이트 오프셋, 시간 범위, 주요 채널 min/max
+INDEX_SUFFIX = ".idx"
+INDEX_BLOCK_ROWS = 100            # 20Hz 기준 약 5초
+INDEX_KEY_CHANNELS = ("RPM", "VSS_kmh", "GPS_Speed_KPH", "Latitude", "Longitude")
+
+# ===================== 세션 통계 캐시 =================
+# python -m can_logger.session_stats 로 LOG_DIR 의 datalog_*.csv 를 병렬 분석
+# 결과는 파일 해시/mtime 기준으로 캐시되어 새/변경 세션만 다시 처리
+STATS_DB_PATH = os.path.join(LOG_DIR, "session_stats.sqlite3")
+STATS_PERCENTILES = (50, 95, 99)
+STATS_SKETCH_ACCURACY = 0.01      # 백분위 근사 상대 오차(로그 버킷 스케치, 메모리 상한)
+# 경고 규칙: 모든 조건을 동시에 만족한 행의 수/지속시간 집계 (조건 문법은 session_query 와 동일)
+STATS_WARNINGS = {
+    "low_oil_pressure_high_rpm": ("RPM > 6000", "OilPressure_bar < 2.0"),
+    "high_coolant_temp": ("CLT_C >= 110",),
+    "high_oil_temp": ("OilTemp_C >= 130",),
+    "low_battery_running": ("Batt_V < 12.0", "RPM > 1000"),
+}
+
+# ===================== 업링크(링크 품질 적응) =================
+# 실제 업로드 결과로 RTT/성공률은 EWMA, 처리량은 최근 윈도 회귀로 추정하고,
+# 링크가 유휴 상태일 때만 가벼운 TCP 프로브를 보냄
+UPLINK_PROBE_ADDR = ("8.8.8.8", 53)
+UPLINK_PROBE_IDLE_SEC = 5.0       # 이 시간 동안 업로드가 없으면 프로브
+UPLINK_EWMA_ALPHA = 0.2
+UPLINK_BUDGET_FRACTION = 0.5      # 업로드 주기당 추정 처리량 중 사용할 비율
+# 처리량: 최근 요청들의 (본문 크기, RTT)를 선형 회귀한 기울기(초/바이트)의 역수
+# - RTT = 지연 + 크기/대역폭 → 지연(절편)과 분리되므로 작은 실시간 패치로도 추정 가능
+# - 크기 차이가 너무 작으면(모두 같은 그룹 등) 기울기가 노이즈뿐이라 갱신하지 않음
+UPLINK_THROUGHPUT_WINDOW_SEC = 10.0
+UPLINK_THROUGHPUT_MIN_SAMPLES = 6
+UPLINK_THROUGHPUT_MIN_SPREAD = 512   # 윈도 내 본문 크기 max-min 최소값(바이트)
+
+# 등급별 그룹 업로드 주기 배율과 전송할 채널 우선순위 상한(1=필수만, 3=전체)
+UPLINK_TIERS = {
+    "good": {"rate_scale": 1.0, "max_priority": 3},
+    "fair": {"rate_scale": 2.5, "max_priority": 2},
+    "poor": {"rate_scale": 5.0, "max_priority": 1},
+    "down": {"rate_scale": 10.0, "max_priority": 1},
+}
+
+# 채널 우선순위(목록에 없는 채널은 3)
+CHANNEL_PRIORITY = {
+    **{name: 1 for name in (
+        "RPM", "TPS_percent", "VSS_kmh", "CLT_C", "OilTemp_C", "OilPressure_bar",
+        "Batt_V", "CEL_Error", "Latitude", "Longitude", "GPS_Speed_KPH",
+    )},
+    **{name: 2 for name in (
+        "MAP_kPa", "IAT_C", "FuelPressure_bar", "WBO_Lambda", "Gear", "IgnAngle_deg",
+        "EGT1_C", "EGT2_C", "FuelUsed_L", "Satellites", "ax_g", "ay_g", "az_g",
+        "LongG", "LatG", "Gear_calc", "FuelRate_Lph",
+    )},
+}
+
 # ===================== 기타 옵션 =================
 # 콘솔에 수신 NMEA 원문/요약 출력(원하면 False)
 GPS_VERBOSE = True
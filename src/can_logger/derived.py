@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+파생 채널 계산
+- config.DERIVED_CHANNELS 의 선언을 시작 시 한 번 컴파일(kind → 상태를 가진 계산 객체)
+- 실시간: 입력 채널이 갱신될 때 그 입력에 의존하는 식만 다시 계산(필터 상태는 O(1))
+- 기록된 세션: 같은 계산 객체를 같은 갱신 기준(입력 값 변경 시)으로 컬럼 단위 적용
+  (CSV 는 20Hz 샘플이므로 그보다 빠른 입력 변화는 실시간과 차이가 날 수 있음)
+
+예) 파생 채널이 없던 예전 로그에 컬럼 추가
+  python -m can_logger.derived logs/datalog_20250101_120000.csv -o logs/datalog_20250101_120000_derived.csv
+"""
+
+import argparse
+import csv
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .config import DERIVED_CHANNELS
+from .session_index import parse_timestamp
+
+
+class _Lowpass:
+    """1차 저역통과(EMA). 계수를 dt/시정수로 구해 갱신 빈도와 무관하게 같은 응답"""
+    __slots__ = ("tau_s", "y", "t")
+
+    def __init__(self, tau_s: float):
+        self.tau_s = tau_s
+        self.y: Optional[float] = None
+        self.t = 0.0
+
+    def update(self, ts: float, x: float) -> float:
+        if self.y is None or self.tau_s <= 0:
+            self.y = x
+        elif ts > self.t:
+            self.y += (1.0 - math.exp(-(ts - self.t) / self.tau_s)) * (x - self.y)
+        self.t = ts
+        return self.y
+
+
+class _Gear:
+    """RPM/속도 비 → 가장 가까운 기어 (허용 오차 밖이면 0)"""
+    def __init__(self, ratios: Sequence[float], min_kmh: float, tolerance: float):
+        self.ratios = tuple(ratios)
+        self.min_kmh = min_kmh
+        self.tolerance = tolerance
+
+    def step(self, ts: float, rpm: float, kmh: float) -> Optional[float]:
+        if kmh < self.min_kmh or rpm <= 0:
+            return 0.0
+        r = rpm / kmh
+        best, err = 0, math.inf
+        for i, ratio in enumerate(self.ratios):
+            e = abs(r - ratio) / ratio
+            if e < err:
+                best, err = i + 1, e
+        return float(best) if err <= self.tolerance else 0.0
+
+
+class _Rotate:
+    """센서 좌표계 (ax, ay) → 차량 좌표계 종/횡 성분"""
+    def __init__(self, axis: str, yaw_deg: float, tau_s: float):
+        if axis not in ("long", "lat"):
+            raise ValueError(f"rotate axis 는 long/lat 중 하나: {axis!r}")
+        yaw = math.radians(yaw_deg)
+        c, s = math.cos(yaw), math.sin(yaw)
+        self.k = (c, -s) if axis == "long" else (s, c)
+        self.lp = _Lowpass(tau_s)
+
+    def step(self, ts: float, ax: float, ay: float) -> Optional[float]:
+        return self.lp.update(ts, self.k[0] * ax + self.k[1] * ay)
+
+
+class _Rate:
+    """
+    dx/dt * scale (저역통과)
+    - 기울기는 마지막으로 값이 바뀐 시점부터 계산
+    - 값이 그대로인 hold 갱신은 기준점을 옮기지 않고 출력만 0 쪽으로 제한:
+      양자화된 카운터(quantum 단위)가 dt 동안 안 바뀌었으면 |기울기| < quantum/dt
+    """
+    def __init__(self, scale: float, tau_s: float, quantum: float = 0.0):
+        self.scale = scale
+        self.quantum = quantum
+        self.lp = _Lowpass(tau_s)
+        self.last: Optional[Tuple[float, float]] = None
+        self.raw = 0.0
+
+    def step(self, ts: float, x: float) -> Optional[float]:
+        last = self.last
+        if last is None:
+            self.last = (ts, x)
+            return None
+        if ts <= last[0]:
+            return self.lp.y
+        if x == last[1]:
+            if self.lp.y is None:
+                return None
+            bound = self.quantum / (ts - last[0]) * abs(self.scale)
+            return self.lp.update(ts, math.copysign(min(abs(self.raw), bound), self.raw))
+        self.last = (ts, x)
+        self.raw = (x - last[1]) / (ts - last[0]) * self.scale
+        return self.lp.update(ts, self.raw)
+
+
+class _PwFuel:
+    """인젝터 펄스폭 기반 순간 연료 소모(L/h), 4행정 기준 2회전에 1회 분사"""
+    def __init__(self, flow_cc_min: float, dead_time_ms: float, cylinders: int, tau_s: float):
+        # cc/min → L/h, 펄스폭 ms → min, 분사 횟수 = RPM/2 * 기통수
+        self.k = flow_cc_min * cylinders / 2 / 60000.0 * 60 / 1000
+        self.dead_time_ms = dead_time_ms
+        self.lp = _Lowpass(tau_s)
+
+    def step(self, ts: float, pw_ms: float, rpm: float) -> Optional[float]:
+        return self.lp.update(ts, self.k * rpm * max(pw_ms - self.dead_time_ms, 0.0))
+
+
+_KINDS = {
+    "gear": _Gear,
+    "rotate": _Rotate,
+    "rate": _Rate,
+    "pw_fuel": _PwFuel,
+}
+
+
+def compile_formula(spec: Mapping[str, Any]):
+    """선언 1개 → 상태를 가진 계산 객체"""
+    params = {k: v for k, v in spec.items() if k not in ("name", "kind", "inputs", "hold_s")}
+    try:
+        cls = _KINDS[spec["kind"]]
+    except KeyError:
+        raise ValueError(f"알 수 없는 파생 채널 kind: {spec.get('kind')!r} ({spec.get('name')})")
+    return cls(**params)
+
+
+class DerivedEngine:
+    """
+    - update(parsed)에 워커 파싱 결과를 넘기면, 값이 바뀐 입력에 의존하는 파생값만 반환
+      (같은 값이 반복 수신되면 계산하지 않음 — 기록된 CSV 에서 구분할 수 있는 것과 동일한 기준,
+       단 hold_s 가 지나면 한 번 계산)
+    - 여러 워커 스레드에서 호출 가능
+    """
+    def __init__(self, specs: Sequence[Mapping[str, Any]] = DERIVED_CHANNELS):
+        self._formulas = [
+            (s["name"], tuple(s["inputs"]), compile_formula(s), s.get("hold_s"))
+            for s in specs
+        ]
+        self._by_input: Dict[str, List[int]] = {}
+        for idx, (_, inputs, _, _) in enumerate(self._formulas):
+            for name in inputs:
+                self._by_input.setdefault(name, []).append(idx)
+        self._latest: Dict[str, float] = {}
+        self._last_step = [-math.inf] * len(self._formulas)
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(f[0] for f in self._formulas)
+
+    def update(self, parsed: Mapping[str, Any], ts: Optional[float] = None) -> Dict[str, float]:
+        now = ts if ts is not None else time.time()
+        by_input, latest = self._by_input, self._latest
+        out: Dict[str, float] = {}
+        with self._lock:
+            changed: List[int] = []
+            held: List[int] = []
+            for name, v in parsed.items():
+                deps = by_input.get(name)
+                if deps is None or v is None:
+                    continue
+                try:
+                    fv = float(v)
+                except (TypeError, ValueError):
+                    continue
+                if latest.get(name) == fv:
+                    held.extend(deps)
+                    continue
+                latest[name] = fv
+                changed.extend(deps)
+            changed_set = set(changed)
+            for idx in sorted(changed_set | set(held)):
+                name, inputs, formula, hold_s = self._formulas[idx]
+                if idx not in changed_set and not _hold_expired(hold_s, now, self._last_step[idx]):
+                    continue
+                args = [latest.get(i) for i in inputs]
+                if None in args:
+                    continue
+                self._last_step[idx] = now
+                y = formula.step(now, *args)
+                if y is not None:
+                    out[name] = y
+        return out
+
+
+def _hold_expired(hold_s: Optional[float], now: float, last_step: float) -> bool:
+    return hold_s is not None and now - last_step >= hold_s
+
+
+def apply_to_columns(
+    columns: Mapping[str, Sequence[float]],
+    timestamps: Sequence[float],
+    specs: Sequence[Mapping[str, Any]] = DERIVED_CHANNELS
+) -> Dict[str, array]:
+    """
+    기록된 세션용: 입력 컬럼(NaN = 값 없음)에 각 식을 컬럼 단위로 적용
+    - CSV 는 마지막 값을 매 행 반복 기록하므로, 입력 값이 바뀐 행(또는 hold_s 경과)에서만
+      계산 — DerivedEngine.update 와 같은 기준
+    - 계산하지 않은 행은 직전 결과를 유지(실시간 저장소와 동일)
+    """
+    n = len(timestamps)
+    out: Dict[str, array] = {}
+    for spec in specs:
+        formula = compile_formula(spec)
+        cols = [columns.get(name) for name in spec["inputs"]]
+        result = array("d", [math.nan]) * n
+        out[spec["name"]] = result
+        if any(c is None for c in cols):
+            continue
+        hold_s = spec.get("hold_s")
+        held: List[Optional[float]] = [None] * len(cols)
+        last_step = -math.inf
+        y: Optional[float] = None
+        for i in range(n):
+            changed = False
+            for j, c in enumerate(cols):
+                v = c[i]
+                if not math.isnan(v) and v != held[j]:
+                    held[j] = v
+                    changed = True
+            if None in held:
+                continue
+            ts = timestamps[i]
+            if changed or _hold_expired(hold_s, ts, last_step):
+                last_step = ts
+                y = formula.step(ts, *held)
+            if y is not None:
+                result[i] = y
+    return out
+
+
+def _fmt(v: float) -> Any:
+    if math.isnan(v):
+        return ""
+    return round(v, 4)
+
+
+def derive_csv(src: str, dst: str, specs: Sequence[Mapping[str, Any]] = DERIVED_CHANNELS,
+               recompute: bool = False):
+    """
+    CSV 두 번 스트리밍: 1) 입력 컬럼만 array('d')로 적재 2) 파생 컬럼을 붙여 기록
+    - 이미 기록된 파생 컬럼(실시간 계산값)은 recompute=True 일 때만 덮어씀
+    """
+    needed = {name for s in specs for name in s["inputs"]}
+    with open(src, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        col = {name: i for i, name in enumerate(header) if name in needed}
+        columns = {name: array("d") for name in col}
+        timestamps = array("d")
+        for row in reader:
+            timestamps.append(parse_timestamp(row[0]))
+            for name, i in col.items():
+                try:
+                    columns[name].append(float(row[i]))
+                except (IndexError, ValueError):
+                    columns[name].append(math.nan)
+
+    derived = apply_to_columns(columns, timestamps, specs)
+    names = [s["name"] for s in specs]
+    replace = {name: header.index(name) for name in names if name in header} if recompute else {}
+    append = [name for name in names if name not in header]
+
+    with open(src, "r", newline="", encoding="utf-8") as f, \
+            open(dst, "w", newline="", encoding="utf-8") as g:
+        reader = csv.reader(f)
+        writer = csv.writer(g)
+        writer.writerow(next(reader) + append)
+        for i, row in enumerate(reader):
+            for name, j in replace.items():
+                if j < len(row):
+                    row[j] = _fmt(derived[name][i])
+            writer.writerow(row + [_fmt(derived[name][i]) for name in append])
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    ap = argparse.ArgumentParser(description="기록된 세션 로그에 파생 채널 계산/추가")
+    ap.add_argument("csv", help="datalog_*.csv 경로")
+    ap.add_argument("-o", "--output", help="출력 CSV (기본: <입력>_derived.csv)")
+    ap.add_argument("--recompute", action="store_true", help="이미 기록된 파생 컬럼도 다시 계산해 덮어씀")
+    args = ap.parse_args(argv)
+    dst = args.output or (args.csv[:-4] if args.csv.endswith(".csv") else args.csv) + "_derived.csv"
+    derive_csv(args.csv, dst, recompute=args.recompute)
+    print(f"[INFO] 파생 채널 기록 완료: {dst}")
+
+
+if __name__ == "__main__":
+    main()
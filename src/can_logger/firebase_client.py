@@ -2,15 +2,36 @@
 
 import json
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import requests
 from .config import FIREBASE_DB_URL, FIREBASE_AUTH, FIREBASE_ENABLE
 
 class FirebaseClient:
-    def __init__(self, base_url: str = FIREBASE_DB_URL, auth: Optional[str] = FIREBASE_AUTH, enabled: bool = FIREBASE_ENABLE):
+    def __init__(
+        self,
+        base_url: str = FIREBASE_DB_URL,
+        auth: Optional[str] = FIREBASE_AUTH,
+        enabled: bool = FIREBASE_ENABLE,
+        on_result: Optional[Callable[[bool, float, int], None]] = None
+    ):
         self.base_url = base_url
         self.auth = auth
         self.enabled = enabled and bool(base_url)
+        # 요청별 (성공 여부, RTT[s], 전송 바이트) 보고 (업링크 품질 추정용)
+        self.on_result = on_result
+
+    def _send(self, method: Callable[..., requests.Response], path: str, data: Dict[str, Any]) -> bool:
+        body = json.dumps(data)
+        t0 = time.monotonic()
+        try:
+            r = method(self._url(path), data=body, timeout=3)
+            r.raise_for_status()
+            ok = True
+        except requests.RequestException:
+            ok = False
+        if self.on_result:
+            self.on_result(ok, time.monotonic() - t0, len(body))
+        return ok
 
     def _url(self, path: str) -> str:
         path = path if path.startswith("/") else ("/" + path)
@@ -23,23 +44,13 @@ class FirebaseClient:
         """경로에 현재 상태를 업데이트 (부분 갱신)"""
         if not self.enabled:
             return True
-        try:
-            r = requests.patch(self._url(path), data=json.dumps(data), timeout=3)
-            r.raise_for_status()
-            return True
-        except requests.RequestException:
-            return False
+        return self._send(requests.patch, path, data)
 
     def post(self, path: str, data: Dict[str, Any]) -> bool:
         """경로에 새 노드로 추가(시계열 적합)"""
         if not self.enabled:
             return True
-        try:
-            r = requests.post(self._url(path), data=json.dumps(data), timeout=3)
-            r.raise_for_status()
-            return True
-        except requests.RequestException:
-            return False
+        return self._send(requests.post, path, data)
 
     @staticmethod
     def now_ms() -> int:
@@ -11,13 +11,19 @@ from datetime import datetime
 # 모듈 임포트
 from .config import (
     LOG_DIR, SERIAL_PORT, BAUD_RATE, CAN_CHANNEL, CAN_BITRATE,
-    EMU_IDS, FB_PATHS, CAN_UPLOAD_INTERVAL_SEC, GPS_UPLOAD_INTERVAL_SEC
+    EMU_IDS, FB_PATHS, ALL_CHANNELS,
+    REALTIME_GROUPS, REALTIME_TICK_SEC
 )
 from .firebase_client import FirebaseClient
-from .gpio_ctl import GpioController
+from .gpio_ctrl import GpioController
 from .can_worker import CanWorker
-from .gps_worker import GpioController
+from .gps_worker import GpsWorker
+from .state_store import StateStore
+from .derived import DerivedEngine
+from .session_index import SessionIndexWriter, parse_timestamp
 from .wifi_monitor import start_wifi_monitor
+from .uplink import UplinkManager
+from .realtime import RealtimeScheduler
 from .accel_worker import AccelWorker
 
 # ======== 전역 상태 변수 ========
@@ -25,35 +31,46 @@ exit_event = threading.Event()
 logging_active = False
 last_button_press_time = 0.0
 
-# 데이터 저장소
-latest_can_data = {}
-latest_gps_data = {}
-latest_acc_data = {}
+# 데이터 저장소 (채널별 고정 슬롯, 스레드별 스냅샷 버퍼)
+state = StateStore(ALL_CHANNELS)
+_main_snap = state.snapshot()
+
+# 파생 채널(기어 추정, 차량 좌표계 G, 연료 소모율 등) — 입력 갱신 시 증분 계산
+derived = DerivedEngine()
+
+# 링크 품질 추정(업로드 주기/채널 선택에 사용)
+uplink = UplinkManager()
 
 # CSV 로깅 관련
 csv_file = None
 csv_writer = None
+session_index = None
 
 # ======== 콜백 함수들 ========
+def _store(parsed: dict):
+    """원본 값과 그에 의존하는 파생 값을 같은 시각으로 저장소에 기록"""
+    now = time.time()
+    state.update(parsed, now)
+    out = derived.update(parsed, now)
+    if out:
+        state.update(out, now)
+
 def on_can_message(arbitration_id: int, parsed: dict):
     """CAN 메시지 수신 시 호출될 콜백"""
-    global latest_can_data
-    latest_can_data.update(parsed)
+    _store(parsed)
 
 def on_gps_update(parsed: dict):
     """GPS 데이터 갱신 시 호출될 콜백"""
-    global latest_gps_data
-    latest_gps_data.update(parsed)
+    _store(parsed)
 
 def on_accel_update(parsed: dict):
     """가속도계 데이터 갱신 시 호출될 콜백"""
-    global latest_acc_data
-    latest_acc_data.update(parsed)
+    _store(parsed)
 
 # ======== 핵심 로직 ========
 def toggle_logging_state(gpio: GpioController):
     """CSV 로깅 상태를 토글합니다."""
-    global logging_active, csv_file, csv_writer
+    global logging_active, csv_file, csv_writer, session_index
     logging_active = not logging_active
 
     if logging_active:
@@ -64,18 +81,11 @@ def toggle_logging_state(gpio: GpioController):
         
         csv_file = open(filename, 'w', newline='', encoding='utf-8')
         
-        fieldnames = [
-            "Timestamp", "Latitude", "Longitude", "GPS_Speed_KPH", "Satellites", "Altitude_m", "Heading_deg",
-            "RPM","TPS_percent","IAT_C","MAP_kPa","PulseWidth_ms","AnalogIn1_V","AnalogIn2_V","AnalogIn3_V","AnalogIn4_V",
-            "VSS_kmh","Baro_kPa","OilTemp_C","OilPressure_bar","FuelPressure_bar","CLT_C","IgnAngle_deg","DwellTime_ms",
-            "WBO_Lambda","LambdaCorrection_percent","EGT1_C","EGT2_C","Gear","EmuTemp_C","Batt_V","CEL_Error","Flags1",
-            "Ethanol_percent","DBW_Pos_percent","DBW_Target_percent","TC_drpm_raw","TC_drpm","TC_TorqueReduction_percent",
-            "PitLimit_TorqueReduction_percent","AnalogIn5_V","AnalogIn6_V","OutFlags1","OutFlags2","OutFlags3","OutFlags4",
-            "BoostTarget_kPa","PWM1_DC_percent","DSG_Mode","LambdaTarget","PWM2_DC_percent","FuelUsed_L",
-            "ax_g", "ay_g", "az_g"
-        ]
-        csv_writer = csv.DictWriter(csv_file, fieldnames=fieldnames, extrasaction='ignore')
-        csv_writer.writeheader()
+        # 컬럼 순서 = 상태 저장소 슬롯 순서
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(["Timestamp", *state.channels])
+        # 사이드카 인덱스(<파일명>.idx): 블록별 오프셋/시간/주요 채널 min/max
+        session_index = SessionIndexWriter(filename, ["Timestamp", *state.channels])
     else:
         print("\n[INFO] 로깅 중지.")
         gpio.set_logging_led(False)
@@ -83,63 +93,57 @@ def toggle_logging_state(gpio: GpioController):
             name = csv_file.name
             csv_file.close()
             print(f"[INFO] 로그 파일 저장 완료: {name}")
+        if session_index:
+            session_index.close()
         csv_file = None
         csv_writer = None
+        session_index = None
 
 def write_csv_log_entry(gpio: GpioController):
     """결합된 데이터로 CSV 파일에 한 줄을 기록합니다."""
     if not logging_active or not csv_writer:
         return
 
-    full_row = {
-        "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
-        "Latitude": latest_gps_data.get("lat"), "Longitude": latest_gps_data.get("lon"),
-        "GPS_Speed_KPH": latest_gps_data.get("GPS_Speed_KPH"), "Satellites": latest_gps_data.get("satellites"),
-        "Altitude_m": latest_gps_data.get("altitude"), "Heading_deg": latest_gps_data.get("heading"),
-    }
-    full_row.update(latest_can_data)
-    full_row.update(latest_acc_data)
-    
-    csv_writer.writerow(full_row)
-    gpio.blink_logging_led_once(duration_ms=50)
+    snap = state.snapshot(_main_snap)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    if session_index:
+        # 블록 시간 범위는 기록되는 Timestamp 문자열(ms 단위)과 같아야 조회 경계가 맞음
+        session_index.add_row(csv_file, parse_timestamp(timestamp), snap)
+    csv_writer.writerow([timestamp, *snap.row()])
+    gpio.blink_logging_led_once(on_ms=50)
 
 def print_status_line():
     """터미널에 현재 상태를 한 줄로 출력합니다."""
-    gps_status = "OK" if latest_gps_data.get("gps_fix") else "No Fix"
-    vss = latest_can_data.get('VSS_kmh', 0.0)
+    snap = state.snapshot(_main_snap)
+    # RMC는 유효(A)일 때만 위치를 주므로 최근 위치 갱신 여부로 Fix 판단
+    gps_status = "OK" if snap.age("Latitude") < 3.0 else "No Fix"
+    vss = snap.get('VSS_kmh', 0.0)
     status_text = (
         "RPM:{:>5} | MAP:{:>3}kPa | TPS:{:>5.1f}% | Batt:{:>4.1f}V | "
         "CLT:{:>4}°C | VSS:{:>5.1f}km/h | GPS:{} | Logging: {}"
     ).format(
-        latest_can_data.get('RPM', 0), latest_can_data.get('MAP_kPa', 0),
-        latest_can_data.get('TPS_percent', 0.0), latest_can_data.get('Batt_V', 0.0),
-        latest_can_data.get('CLT_C', 0), vss, gps_status, "ON" if logging_active else "OFF"
+        snap.get('RPM', 0), snap.get('MAP_kPa', 0),
+        snap.get('TPS_percent', 0.0), snap.get('Batt_V', 0.0),
+        snap.get('CLT_C', 0), vss, gps_status, "ON" if logging_active else "OFF"
     )
     sys.stdout.write("\r" + status_text + "    ")
 
-def can_firebase_uploader(fb: FirebaseClient, stop_event: threading.Event):
-    """주기적으로 CAN + 가속도계 데이터를 Firebase에 업로드"""
-    while not stop_event.is_set():
-        data_to_upload = {}
-        data_to_upload.update(latest_can_data)
-        data_to_upload.update(latest_acc_data)
-
-        if data_to_upload:
-            data_to_upload['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            # VSS 대체 로직 제거
-            fb.patch(FB_PATHS["LEGACY_REALTIME"], data_to_upload)
-        
-        stop_event.wait(CAN_UPLOAD_INTERVAL_SEC)
+def realtime_firebase_uploader(fb: FirebaseClient, stop_event: threading.Event):
+    """채널 그룹(fast/medium/slow)별 주기로 각자의 실시간 노드에 업로드"""
+    snap = state.snapshot()
+    scheduler = RealtimeScheduler(uplink)
 
-def gps_firebase_uploader(fb: FirebaseClient, stop_event: threading.Event):
-    """주기적으로 GPS 데이터를 Firebase에 업로드"""
     while not stop_event.is_set():
-        if latest_gps_data:
-            data_to_upload = latest_gps_data.copy()
-            data_to_upload['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            fb.patch(FB_PATHS["LEGACY_REALTIME"], data_to_upload)
+        policy = uplink.policy()
+        state.snapshot(snap)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
 
-        stop_event.wait(GPS_UPLOAD_INTERVAL_SEC)
+        # 멀티 경로 PATCH 한 번으로 그룹 노드 + (주기마다) 레거시 노드 동시 갱신
+        for send in scheduler.plan(snap, time.monotonic(), timestamp, policy):
+            ok = fb.patch("/", send.body)
+            scheduler.done(send, ok, time.monotonic(), policy)
+
+        stop_event.wait(REALTIME_TICK_SEC)
 
 def handle_exit(signum, frame):
     print("\n[INFO] 종료 신호 수신. 리소스를 정리합니다...")
@@ -172,9 +176,9 @@ def main():
 
     # --- 초기화 ---
     gpio = GpioController()
-    fb = FirebaseClient()
-    can_worker = CanWorker(on_message=on_can_message)
-    gps_worker = GpsWorker(port=SERIAL_PORT, baudrate=BAUD_RATE, on_update=on_gps_update)
+    fb = FirebaseClient(on_result=uplink.record)
+    can_worker = CanWorker(on_parsed=on_can_message)
+    gps_worker = GpsWorker(serial_port=SERIAL_PORT, baudrate=BAUD_RATE, on_update=on_gps_update)
     accel_worker = AccelWorker(on_update=on_accel_update)
     
     # --- Worker 시작 ---
@@ -193,19 +197,21 @@ def main():
         print(f"[WARNING] 가속도계 시작 실패: {e}. 가속도 데이터 없이 계속합니다.", file=sys.stderr)
 
     # --- 스레드 시작 ---
-    start_wifi_monitor(gpio, exit_event)
+    start_wifi_monitor(gpio, exit_event, uplink)
     
-    can_fb_thread = threading.Thread(target=can_firebase_uploader, args=(fb, exit_event), daemon=True)
-    gps_fb_thread = threading.Thread(target=gps_firebase_uploader, args=(fb, exit_event), daemon=True)
+    rt_fb_thread = threading.Thread(target=realtime_firebase_uploader, args=(fb, exit_event), daemon=True)
     
     # 데이터 수집 워커 스레드
     can_thread = threading.Thread(target=worker_loop, args=(can_worker, exit_event), daemon=True)
     gps_thread = threading.Thread(target=worker_loop, args=(gps_worker, exit_event), daemon=True)
     accel_thread = threading.Thread(target=worker_loop, args=(accel_worker, exit_event), daemon=True)
 
-    can_fb_thread.start()
-    gps_fb_thread.start()
-    print("Firebase 업로드 스레드 시작 (CAN/ACC: 0.2s, GPS: 1.0s)")
+    rt_fb_thread.start()
+    rates = ", ".join(
+        f"{name}: {g['interval']}s" if g["interval"] else f"{name}: 변경 시"
+        for name, g in REALTIME_GROUPS.items()
+    )
+    print(f"Firebase 업로드 스레드 시작 ({rates}, 링크 품질에 따라 조정)")
     
     can_thread.start()
     gps_thread.start()
@@ -249,8 +255,7 @@ def main():
         can_thread.join(timeout=0.5)
         gps_thread.join(timeout=0.5)
         accel_thread.join(timeout=0.5)
-        can_fb_thread.join(timeout=0.5)
-        gps_fb_thread.join(timeout=0.5)
+        rt_fb_thread.join(timeout=0.5)
 
         can_worker.shutdown()
         gps_worker.shutdown()
@@ -259,6 +264,8 @@ def main():
         if csv_file and not csv_file.closed:
             csv_file.close()
             print(f"[INFO] 로그 파일 저장 완료: {csv_file.name}")
+        if session_index:
+            session_index.close()
         
         gpio.cleanup()
         print("[INFO] 프로그램이 완전히 종료되었습니다.")
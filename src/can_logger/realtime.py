@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+실시간 업로드 스케줄 (네트워크 없음)
+- 채널 그룹(fast/medium/slow)별 전송 시점과 보낼 값, 멀티 경로 PATCH 본문 결정
+- 업로더 루프는 매 틱 plan() → fb.patch("/", send.body) → done() 순서로 호출
+- 주기 그룹: interval * 링크 등급 배율마다 전송
+- 변경 시 그룹(interval=None): 마지막으로 전송 성공한 값과 다른 채널만, 실패하면 재시도를 늦춤
+- 레거시 병합 노드 미러: 그룹 값을 모아 두었다가 REALTIME_MIRROR_INTERVAL 마다 한 요청에만 실음
+  (예산을 넘는 링크에서는 채널보다 미러를 먼저 제외)
+"""
+
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from .config import (
+    FB_PATHS, REALTIME_GROUPS, REALTIME_TICK_SEC, REALTIME_SLOW_RETRY_SEC,
+    REALTIME_LEGACY_MIRROR, REALTIME_MIRROR_INTERVAL,
+)
+from .state_store import Snapshot
+from .uplink import UplinkManager, UplinkPolicy
+
+
+class Send(NamedTuple):
+    group: str
+    data: Dict[str, Any]    # 그룹 노드에 쓰는 값(timestamp 포함)
+    mirror: Dict[str, Any]  # 함께 실은 레거시 미러 값(없으면 빈 dict)
+    body: Dict[str, Any]    # PATCH "/" 본문
+
+
+class RealtimeScheduler:
+    def __init__(
+        self,
+        uplink: UplinkManager,
+        groups: Mapping[str, Mapping[str, Any]] = REALTIME_GROUPS,
+        mirror: bool = REALTIME_LEGACY_MIRROR
+    ):
+        self.uplink = uplink
+        self.groups = [
+            (name, tuple(g["channels"]), g["interval"], FB_PATHS[f"REALTIME_{name.upper()}"].strip("/"))
+            for name, g in groups.items()
+        ]
+        self.interval: Dict[str, Optional[float]] = {name: g["interval"] for name, g in groups.items()}
+        self.next_due = {name: 0.0 for name in groups}
+        self.last_sent: Dict[str, Dict[str, Any]] = {name: {} for name in groups}  # 변경 시 그룹용
+        self.mirror = mirror
+        self.legacy = FB_PATHS["LEGACY_REALTIME"].strip("/")
+        self._mirror_due = 0.0
+        self._mirror_pending: Dict[str, Any] = {}
+
+    def plan(self, snap: Snapshot, now: float, timestamp: str, policy: UplinkPolicy) -> List[Send]:
+        """now(monotonic) 시점에 보낼 그룹별 요청"""
+        due = []
+        for name, channels, interval, path in self.groups:
+            if now < self.next_due[name]:
+                continue
+            if interval is not None:
+                self.next_due[name] = now + interval * policy.rate_scale
+            data = snap.to_dict(self.uplink.fields(channels, policy.max_priority))
+            if interval is None:
+                sent = self.last_sent[name]
+                data = {k: v for k, v in data.items() if sent.get(k) != v}
+            if not data:
+                continue
+            data["timestamp"] = timestamp
+            due.append((name, path, data, interval or REALTIME_TICK_SEC))
+            if self.mirror:
+                self._mirror_pending.update(data)
+        return [self._build(*d, now, policy) for d in due]
+
+    def _build(self, name: str, path: str, data: Dict[str, Any], interval: float,
+               now: float, policy: UplinkPolicy) -> Send:
+        legacy = self.legacy
+
+        def body(d, mirror):
+            out = {f"{path}/{k}": v for k, v in d.items()}
+            out.update({f"{legacy}/{k}": v for k, v in mirror.items()})
+            return out
+
+        mirror: Dict[str, Any] = {}
+        pending = self._mirror_pending
+        if pending and now >= self._mirror_due:
+            # 미러를 실으면 채널을 줄여야 하는 링크면 이번에는 미러를 싣지 않음(값은 보관)
+            if len(self.uplink.trim(data, interval, encode=lambda d: body(d, pending))) == len(data):
+                mirror = pending
+                self._mirror_pending = {}
+                self._mirror_due = now + REALTIME_MIRROR_INTERVAL * policy.rate_scale
+        data = self.uplink.trim(data, interval, encode=lambda d: body(d, mirror))
+        return Send(name, data, mirror, body(data, mirror))
+
+    def done(self, send: Send, ok: bool, now: float, policy: UplinkPolicy):
+        """전송 결과 반영(now 는 요청 완료 시점)"""
+        if send.mirror and not ok:
+            # 실패한 미러 값은 그 사이 모인 더 새로운 값 아래로 되돌림
+            self._mirror_pending = {**send.mirror, **self._mirror_pending}
+        if self.interval[send.group] is None:
+            # 변경 시 그룹도 링크 등급만큼 간격을 두고, 실패하면 재시도를 늦춤
+            # (요청 타임아웃 동안 다른 그룹까지 막히지 않도록)
+            if ok:
+                self.last_sent[send.group].update(send.data)
+            retry = REALTIME_TICK_SEC if ok else REALTIME_SLOW_RETRY_SEC
+            self.next_due[send.group] = now + retry * policy.rate_scale
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+세션 로그 사이드카 인덱스
+- 형식: JSON Lines (<CSV 파일명>.idx)
+  {"type": "meta", ...}                     세션 메타데이터(시작 시각, 컬럼, 블록 크기)
+  {"type": "block", "offset": ..., ...}     블록 시작 바이트 오프셋, 행 수, 시간 범위, 채널 min/max
+  {"type": "end", ...}                      종료 시각, 전체 행 수
+- 블록 단위로 append 하므로 비정상 종료 시에도 이미 쓴 블록은 유효
+"""
+
+import csv
+import io
+import json
+import math
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import INDEX_SUFFIX, INDEX_BLOCK_ROWS, INDEX_KEY_CHANNELS
+
+INDEX_VERSION = 1
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def index_path(csv_path: str) -> str:
+    return csv_path + INDEX_SUFFIX
+
+
+def parse_timestamp(text: str) -> float:
+    """CSV Timestamp 컬럼 → epoch 초"""
+    return datetime.strptime(text, TIMESTAMP_FORMAT).timestamp()
+
+
+class SessionIndexWriter:
+    """
+    - 로깅 중 행마다 add_row() 호출(행을 쓰기 직전)
+    - 새 블록의 첫 행에서만 파일 위치(tell)를 읽음
+    """
+    def __init__(
+        self,
+        csv_path: str,
+        columns: Sequence[str],
+        key_channels: Sequence[str] = INDEX_KEY_CHANNELS,
+        block_rows: int = INDEX_BLOCK_ROWS,
+        started: Optional[str] = None
+    ):
+        self.path = index_path(csv_path)
+        self.key_channels = tuple(c for c in key_channels if c in columns)
+        self.block_rows = block_rows
+        self.rows = 0
+        self._block: Optional[Dict[str, Any]] = None
+        self._fh = open(self.path, "w", encoding="utf-8")
+        self._write({
+            "type": "meta",
+            "version": INDEX_VERSION,
+            "csv": os.path.basename(csv_path),
+            "started": started or datetime.now().strftime(TIMESTAMP_FORMAT)[:-3],
+            "columns": list(columns),
+            "key_channels": list(self.key_channels),
+            "block_rows": block_rows,
+        })
+
+    def _write(self, entry: Dict[str, Any]):
+        self._fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._fh.flush()
+
+    def _flush_block(self):
+        if self._block is not None:
+            self._write(self._block)
+            self._block = None
+
+    def add_row(self, offset: Any, ts: float, values: Dict[str, Any]):
+        """
+        offset: 정수 바이트 오프셋 또는 tell()을 가진 파일 객체(블록 시작 시에만 호출)
+        ts: 기록되는 Timestamp 문자열을 parse_timestamp 한 값(ms 단위, 조회 필터와 같은 기준)
+        values: 주요 채널 값(없으면 None)
+        """
+        block = self._block
+        if block is None:
+            off = offset.tell() if hasattr(offset, "tell") else int(offset)
+            block = self._block = {"type": "block", "offset": off, "rows": 0, "t0": ts, "t1": ts, "stats": {}}
+        block["rows"] += 1
+        block["t1"] = ts
+        stats = block["stats"]
+        for name in self.key_channels:
+            v = values.get(name)
+            if v is None or v == "":
+                continue
+            mm = stats.get(name)
+            if mm is None:
+                stats[name] = [v, v]
+            elif v < mm[0]:
+                mm[0] = v
+            elif v > mm[1]:
+                mm[1] = v
+        self.rows += 1
+        if block["rows"] >= self.block_rows:
+            self._flush_block()
+
+    def close(self, ended: Optional[str] = None):
+        if self._fh.closed:
+            return
+        self._flush_block()
+        self._write({
+            "type": "end",
+            "ended": ended or datetime.now().strftime(TIMESTAMP_FORMAT)[:-3],
+            "rows": self.rows,
+        })
+        self._fh.close()
+
+
+def load_index(csv_path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """(meta, blocks, end) 반환. 손상된 마지막 줄은 무시"""
+    meta: Dict[str, Any] = {}
+    blocks: List[Dict[str, Any]] = []
+    end = None
+    with open(index_path(csv_path), "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            kind = entry.get("type")
+            if kind == "meta":
+                meta = entry
+            elif kind == "block":
+                blocks.append(entry)
+            elif kind == "end":
+                end = entry
+    return meta, blocks, end
+
+
+def scan_tail(csv_path: str, blocks: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    종료 기록(end)이 없는 인덱스용: 마지막 블록 이후~EOF 의 행을 임시 블록으로 반환
+    (전원 차단 시 아직 기록되지 않은 마지막 블록. 잘린 마지막 줄은 제외)
+    """
+    with open(csv_path, "rb") as f:
+        if blocks:
+            last = blocks[-1]
+            f.seek(last["offset"])
+            for _ in range(last["rows"]):
+                f.readline()
+        else:
+            f.readline()  # 헤더
+        offset = f.tell()
+        rows = sum(1 for line in f if line.endswith(b"\n"))
+    if rows == 0:
+        return None
+    # 통계가 없으므로 시간/조건 필터는 행 단위로만 적용되도록 범위를 열어 둠
+    return {"type": "block", "offset": offset, "rows": rows, "t0": -math.inf, "t1": math.inf, "stats": {}}
+
+
+def build_index(
+    csv_path: str,
+    key_channels: Sequence[str] = INDEX_KEY_CHANNELS,
+    block_rows: int = INDEX_BLOCK_ROWS
+) -> str:
+    """인덱스 없이 기록된(또는 비정상 종료된) 로그용 사후 인덱싱"""
+    with open(csv_path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]))
+        col = {name: i for i, name in enumerate(header)}
+        offset = f.tell()
+        first = f.readline().decode("utf-8")
+        f.seek(offset)
+        writer = SessionIndexWriter(csv_path, header, key_channels, block_rows, started=first.split(",", 1)[0] or None)
+        keys = writer.key_channels
+        last_ts = None
+        for raw in iter(f.readline, b""):
+            row = next(csv.reader([raw.decode("utf-8")]), None)
+            if row:
+                try:
+                    ts = parse_timestamp(row[0])
+                except ValueError:
+                    offset += len(raw)
+                    continue
+                writer.add_row(offset, ts, {k: _num(row[col[k]]) for k in keys if col[k] < len(row)})
+                last_ts = row[0]
+            offset += len(raw)
+        writer.close(ended=last_ts)
+    return writer.path
+
+
+def _num(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def iter_block_rows(csv_path: str, blocks: Sequence[Dict[str, Any]]) -> Iterator[List[str]]:
+    """
+    선택된 블록만 seek 해서 CSV 행으로 스트리밍
+    - 인덱스는 행을 쓰기 직전에 기록되므로, 전원 차단 시 블록의 마지막 줄이 잘려 있을 수 있음
+      → 줄바꿈으로 끝나지 않는 줄은 제외(scan_tail 과 동일)
+    """
+    with open(csv_path, "rb") as f:
+        for block in blocks:
+            f.seek(block["offset"])
+            lines = [f.readline() for _ in range(block["rows"])]
+            lines = [line for line in lines if line.endswith(b"\n")]
+            text = io.StringIO(b"".join(lines).decode("utf-8"))
+            yield from csv.reader(text)
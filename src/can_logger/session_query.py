@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+세션 로그 구간 조회 도구 (사이드카 인덱스 사용)
+
+예)
+  python -m can_logger.session_query logs/datalog_20250101_120000.csv --from 12:03:10 --to 12:04:40
+  python -m can_logger.session_query logs/datalog_20250101_120000.csv --where "RPM > 7000"
+  python -m can_logger.session_query logs/datalog_20250101_120000.csv --build-index
+
+- 시간 범위와 인덱스된 채널 조건으로 블록을 먼저 걸러낸 뒤, 해당 블록만 읽어 행 단위로 재확인
+- 인덱스가 없으면 먼저 생성, 종료 기록이 없으면 마지막 블록 이후를 행 단위로 조회
+"""
+
+import argparse
+import csv
+import operator
+import os
+import re
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .session_index import (
+    index_path, load_index, build_index, iter_block_rows, parse_timestamp, scan_tail,
+)
+
+_OPS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt,
+    "<=": operator.le, "==": operator.eq, "!=": operator.ne,
+}
+_COND_RE = re.compile(r"^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(-?[\d.]+)\s*$")
+
+Condition = Tuple[str, str, float]
+
+
+def parse_condition(text: str) -> Condition:
+    m = _COND_RE.match(text)
+    if not m:
+        raise ValueError(f"조건 형식 오류: {text!r} (예: 'RPM > 7000')")
+    return m.group(1), m.group(2), float(m.group(3))
+
+
+def eval_condition(cond: Condition, value: float) -> bool:
+    return _OPS[cond[1]](value, cond[2])
+
+
+def parse_time_arg(text: str, session_start: str) -> float:
+    """'HH:MM:SS[.fff]'(세션 날짜 기준) 또는 'YYYY-mm-dd HH:MM:SS[.fff]' → epoch 초"""
+    if " " not in text:
+        text = f"{session_start[:10]} {text}"
+    if "." not in text:
+        text += ".000"
+    return parse_timestamp(text)
+
+
+def _block_may_match(block: Dict[str, Any], t_from: Optional[float], t_to: Optional[float],
+                     conds: Sequence[Condition]) -> bool:
+    if t_from is not None and block["t1"] < t_from:
+        return False
+    if t_to is not None and block["t0"] > t_to:
+        return False
+    stats = block["stats"]
+    for name, op, value in conds:
+        mm = stats.get(name)
+        if mm is None:
+            continue  # 인덱스에 없는 채널은 행 단위로만 판단
+        lo, hi = mm
+        if op in (">", ">=") and not _OPS[op](hi, value):
+            return False
+        if op in ("<", "<=") and not _OPS[op](lo, value):
+            return False
+        if op == "==" and not (lo <= value <= hi):
+            return False
+    return True
+
+
+def query(csv_path: str, t_from: Optional[str] = None, t_to: Optional[str] = None,
+          where: Sequence[str] = ()):
+    """(header, 행 이터레이터) 반환"""
+    if not os.path.exists(index_path(csv_path)):
+        build_index(csv_path)
+    meta, blocks, end = load_index(csv_path)
+    if end is None:
+        # 로깅 중이거나 전원 차단으로 끝난 세션: 인덱스에 없는 꼬리 구간도 조회
+        # (기록 중일 수 있으므로 인덱스 파일은 다시 쓰지 않음)
+        tail = scan_tail(csv_path, blocks)
+        if tail is not None:
+            blocks = blocks + [tail]
+    header: List[str] = meta["columns"]
+    col = {name: i for i, name in enumerate(header)}
+    conds = [parse_condition(w) for w in where]
+    for name, _, _ in conds:
+        if name not in col:
+            raise ValueError(f"알 수 없는 채널: {name}")
+
+    started = meta.get("started", "")
+    f_ts = parse_time_arg(t_from, started) if t_from else None
+    t_ts = parse_time_arg(t_to, started) if t_to else None
+    selected = [b for b in blocks if _block_may_match(b, f_ts, t_ts, conds)]
+
+    def _rows():
+        for row in iter_block_rows(csv_path, selected):
+            if f_ts is not None or t_ts is not None:
+                try:
+                    ts = parse_timestamp(row[0])
+                except (IndexError, ValueError):
+                    continue  # 전원 차단으로 잘린 행 등(build_index 와 동일하게 건너뜀)
+                if (f_ts is not None and ts < f_ts) or (t_ts is not None and ts > t_ts):
+                    continue
+            ok = True
+            for name, op, value in conds:
+                i = col[name]
+                try:
+                    ok = i < len(row) and eval_condition((name, op, value), float(row[i]))
+                except ValueError:
+                    ok = False
+                if not ok:
+                    break
+            if ok:
+                yield row
+
+    return header, _rows()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="세션 로그 구간/조건 조회")
+    ap.add_argument("csv", help="datalog_*.csv 경로")
+    ap.add_argument("--from", dest="t_from", help="시작 시각 (HH:MM:SS 또는 'YYYY-mm-dd HH:MM:SS')")
+    ap.add_argument("--to", dest="t_to", help="종료 시각")
+    ap.add_argument("--where", action="append", default=[], help="조건 (예: 'RPM > 7000'), 여러 번 지정 시 AND")
+    ap.add_argument("--build-index", action="store_true", help="인덱스만 (재)생성")
+    args = ap.parse_args(argv)
+
+    if args.build_index:
+        print(f"[INFO] 인덱스 생성 완료: {build_index(args.csv)}")
+        return
+
+    try:
+        header, rows = query(args.csv, args.t_from, args.t_to, args.where)
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    out = csv.writer(sys.stdout)
+    out.writerow(header)
+    out.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+세션 통계 일괄 분석 + 로컬 캐시(SQLite)
+
+예)
+  python -m can_logger.session_stats                     # LOG_DIR 전체, 새/변경 세션만 처리
+  python -m can_logger.session_stats --top OilTemp_C     # 채널 최대값 기준 세션 순위
+  python -m can_logger.session_stats --force -j 2        # 전부 다시 처리, 프로세스 2개
+
+- 세션 파일마다 한 번만 스트리밍 파싱(해시 계산 포함)하여 길이/거리/채널별 통계/경고 집계
+  (행 값을 보관하지 않음 — 백분위는 채널별 고정 상대오차 스케치로 근사)
+- 크기·mtime 이 캐시와 같으면 건너뜀. mtime 만 바뀐 경우(복사/touch)는 해시가 같으면
+  mtime 만 갱신하고 건너뜀
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import io
+import json
+import math
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import (
+    LOG_DIR, STATS_DB_PATH, STATS_PERCENTILES, STATS_SKETCH_ACCURACY, STATS_WARNINGS,
+)
+from .session_index import parse_timestamp, TIMESTAMP_FORMAT
+from .session_query import parse_condition, eval_condition
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path         TEXT PRIMARY KEY,
+    hash         TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    mtime        REAL NOT NULL,
+    processed_at TEXT NOT NULL,
+    started      TEXT,
+    duration_s   REAL,
+    distance_km  REAL,
+    rows         INTEGER,
+    warnings     TEXT
+);
+CREATE TABLE IF NOT EXISTS channel_stats (
+    path    TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    count   INTEGER,
+    min     REAL,
+    max     REAL,
+    mean    REAL,
+    pcts    TEXT,
+    PRIMARY KEY (path, channel)
+);
+"""
+
+_EARTH_RADIUS_KM = 6371.0088
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class _ChannelStats:
+    """
+    채널 하나의 스트리밍 통계: count/min/max/합계 + 로그 간격 버킷 백분위 스케치
+    - 버킷 수는 값의 범위(자릿수)에만 비례 → 세션 길이와 무관한 메모리
+    - 백분위는 상대 오차 accuracy 이내(0 근처 |v| < 1e-9 는 0으로 취급)
+    """
+    __slots__ = ("count", "min", "max", "total", "_lg", "_pos", "_neg", "_zero")
+
+    def __init__(self, accuracy: float = STATS_SKETCH_ACCURACY):
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.total = 0.0
+        self._lg = math.log((1 + accuracy) / (1 - accuracy))
+        self._pos: Dict[int, int] = {}
+        self._neg: Dict[int, int] = {}
+        self._zero = 0
+
+    def add(self, v: float):
+        self.count += 1
+        self.total += v
+        if v < self.min:
+            self.min = v
+        if v > self.max:
+            self.max = v
+        if v > 1e-9:
+            k = math.ceil(math.log(v) / self._lg)
+            self._pos[k] = self._pos.get(k, 0) + 1
+        elif v < -1e-9:
+            k = math.ceil(math.log(-v) / self._lg)
+            self._neg[k] = self._neg.get(k, 0) + 1
+        else:
+            self._zero += 1
+
+    def _value(self, k: int) -> float:
+        # 버킷 (g^(k-1), g^k] 의 대표값
+        return 2 * math.exp(k * self._lg) / (math.exp(self._lg) + 1)
+
+    def percentile(self, pct: float) -> float:
+        """nearest-rank 근사"""
+        rank = max(0, min(self.count - 1, math.ceil(pct / 100 * self.count) - 1))
+        seen = 0
+        v = self.max
+        for k in sorted(self._neg, reverse=True):
+            seen += self._neg[k]
+            if seen > rank:
+                v = -self._value(k)
+                break
+        else:
+            seen += self._zero
+            if seen > rank:
+                v = 0.0
+            else:
+                for k in sorted(self._pos):
+                    seen += self._pos[k]
+                    if seen > rank:
+                        v = self._value(k)
+                        break
+        return min(max(v, self.min), self.max)
+
+
+def analyze_session(path: str) -> Dict[str, Any]:
+    """
+    (작업 프로세스) CSV 한 개를 스트리밍 파싱해 통계 반환
+    - 거리: GPS 위치(이동 중일 때만) 누적, GPS가 없으면 VSS 적분
+    """
+    st = os.stat(path)
+    h = hashlib.sha1()
+    rules = {name: [parse_condition(c) for c in conds] for name, conds in STATS_WARNINGS.items()}
+
+    with open(path, "rb") as f:
+        first = f.readline()
+        h.update(first)
+        header = next(csv.reader([first.decode("utf-8")]))
+        stats: List[_ChannelStats] = [_ChannelStats() for _ in header]
+        col = {name: i for i, name in enumerate(header)}
+        lat_i, lon_i = col.get("Latitude"), col.get("Longitude")
+        gspd_i, vss_i = col.get("GPS_Speed_KPH"), col.get("VSS_kmh")
+        rule_cols = {name: [(col.get(c[0]), c) for c in conds] for name, conds in rules.items()}
+        warnings = {name: {"rows": 0, "duration_s": 0.0, "first": None} for name in rules}
+
+        rows = 0
+        t_first = t_last = None
+        gps_km = vss_km = 0.0
+        last_pos = None
+        current: List[Optional[float]] = [None] * len(header)  # 직전 값 유지
+
+        text = io.TextIOWrapper(io.BufferedReader(_HashingReader(f, h)), encoding="utf-8", newline="")
+        for row in csv.reader(text):
+            if not row:
+                continue
+            try:
+                ts = parse_timestamp(row[0])
+            except ValueError:
+                continue
+            dt = 0.0 if t_last is None else max(ts - t_last, 0.0)
+            t_first = ts if t_first is None else t_first
+            t_last = ts
+            rows += 1
+
+            for i in range(1, min(len(row), len(header))):
+                cell = row[i]
+                if cell == "":
+                    continue
+                try:
+                    v = float(cell)
+                except ValueError:
+                    continue
+                current[i] = v
+                stats[i].add(v)
+
+            if lat_i is not None and lon_i is not None and current[lat_i] is not None and current[lon_i] is not None:
+                pos = (current[lat_i], current[lon_i])
+                moving = gspd_i is None or (current[gspd_i] or 0.0) > 2.0
+                if last_pos is not None and moving and pos != last_pos:
+                    gps_km += _haversine_km(*last_pos, *pos)
+                last_pos = pos
+            if vss_i is not None and current[vss_i] is not None:
+                vss_km += current[vss_i] * dt / 3600.0
+
+            for name, conds in rule_cols.items():
+                hit = True
+                for i, cond in conds:
+                    v = current[i] if i is not None else None
+                    if v is None or not eval_condition(cond, v):
+                        hit = False
+                        break
+                if hit:
+                    w = warnings[name]
+                    w["rows"] += 1
+                    w["duration_s"] += dt
+                    if w["first"] is None:
+                        w["first"] = row[0]
+
+    channels = {}
+    for i, name in enumerate(header):
+        cs = stats[i]
+        if i == 0 or not cs.count:
+            continue
+        channels[name] = {
+            "count": cs.count,
+            "min": cs.min,
+            "max": cs.max,
+            "mean": cs.total / cs.count,
+            "pcts": {str(p): cs.percentile(p) for p in STATS_PERCENTILES},
+        }
+
+    return {
+        "path": os.path.abspath(path),
+        "hash": h.hexdigest(),
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "started": datetime.fromtimestamp(t_first).strftime(TIMESTAMP_FORMAT)[:-3] if t_first else None,
+        "duration_s": (t_last - t_first) if t_first is not None else 0.0,
+        "distance_km": gps_km if gps_km > 0 else vss_km,
+        "rows": rows,
+        "warnings": {k: v for k, v in warnings.items() if v["rows"]},
+        "channels": channels,
+    }
+
+
+class _HashingReader(io.RawIOBase):
+    """읽는 바이트를 그대로 해시에 반영(파일을 한 번만 읽기 위함)"""
+    def __init__(self, raw, h):
+        self._raw = raw
+        self._h = h
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self._raw.readinto(b)
+        if n:
+            self._h.update(memoryview(b)[:n])
+        return n
+
+
+def file_hash(path: str, chunk: int = 1 << 20) -> str:
+    """analyze_session 과 같은 SHA-1 (파일 전체)"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def open_db(db_path: str = STATS_DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _store(conn: sqlite3.Connection, r: Dict[str, Any]):
+    with conn:
+        conn.execute("DELETE FROM channel_stats WHERE path = ?", (r["path"],))
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?,?,?,?,?,?,?,?,?,?)",
+            (r["path"], r["hash"], r["size"], r["mtime"],
+             datetime.now().strftime(TIMESTAMP_FORMAT)[:-3], r["started"],
+             r["duration_s"], r["distance_km"], r["rows"], json.dumps(r["warnings"])),
+        )
+        conn.executemany(
+            "INSERT INTO channel_stats VALUES (?,?,?,?,?,?,?)",
+            [(r["path"], ch, s["count"], s["min"], s["max"], s["mean"], json.dumps(s["pcts"]))
+             for ch, s in r["channels"].items()],
+        )
+
+
+def find_sessions(log_dir: str = LOG_DIR) -> List[str]:
+    paths = glob.glob(os.path.join(log_dir, "datalog_*.csv"))
+    return sorted(os.path.abspath(p) for p in paths if not p.endswith("_derived.csv"))
+
+
+def update_cache(
+    log_dir: str = LOG_DIR,
+    db_path: str = STATS_DB_PATH,
+    jobs: Optional[int] = None,
+    force: bool = False
+) -> Dict[str, int]:
+    """새/변경 세션만 프로세스 풀로 분석해 캐시에 반영. 처리 건수 반환"""
+    conn = open_db(db_path)
+    cached = {p: (size, mtime, h) for p, size, mtime, h in
+              conn.execute("SELECT path, size, mtime, hash FROM sessions")}
+    paths = find_sessions(log_dir)
+
+    todo = []
+    touched = 0
+    for p in paths:
+        st = os.stat(p)
+        c = cached.get(p)
+        if not force and c is not None:
+            size, mtime, h = c
+            if (size, mtime) == (st.st_size, st.st_mtime):
+                continue
+            # 크기가 같고 mtime 만 다르면 해시로 내용 변경 여부 확인(파싱보다 훨씬 가벼움)
+            if size == st.st_size and file_hash(p) == h:
+                with conn:
+                    conn.execute("UPDATE sessions SET mtime = ? WHERE path = ?", (st.st_mtime, p))
+                touched += 1
+                continue
+        todo.append(p)
+
+    # 이번에 훑은 폴더에서 사라진 파일만 캐시에서 제거(다른 --log-dir 의 세션은 유지)
+    present = set(paths)
+    root = os.path.abspath(log_dir)
+    gone = [p for p in cached if os.path.dirname(p) == root and p not in present]
+    with conn:
+        conn.executemany("DELETE FROM sessions WHERE path = ?", [(p,) for p in gone])
+        conn.executemany("DELETE FROM channel_stats WHERE path = ?", [(p,) for p in gone])
+
+    done = failed = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(analyze_session, p): p for p in todo}
+            for fut in as_completed(futures):
+                p = futures[fut]
+                try:
+                    _store(conn, fut.result())
+                    done += 1
+                    print(f"[INFO] 분석 완료: {os.path.basename(p)}")
+                except Exception as e:
+                    failed += 1
+                    print(f"[ERROR] 분석 실패: {os.path.basename(p)}: {e}", file=sys.stderr)
+    conn.close()
+    return {"total": len(paths), "processed": done, "failed": failed,
+            "skipped": len(paths) - len(todo), "unchanged_touched": touched, "removed": len(gone)}
+
+
+def top_sessions(channel: str, db_path: str = STATS_DB_PATH, limit: int = 10) -> List[sqlite3.Row]:
+    conn = open_db(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(
+        "SELECT s.path, s.started, s.duration_s, c.max, c.pcts FROM channel_stats c "
+        "JOIN sessions s ON s.path = c.path WHERE c.channel = ? ORDER BY c.max DESC LIMIT ?",
+        (channel, limit),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="세션 로그 일괄 통계/캐시")
+    ap.add_argument("--log-dir", default=LOG_DIR)
+    ap.add_argument("--db", default=STATS_DB_PATH)
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    ap.add_argument("--force", action="store_true", help="캐시 무시하고 전부 다시 처리")
+    ap.add_argument("--top", metavar="CHANNEL", help="채널 최대값 기준 세션 순위 출력")
+    args = ap.parse_args(argv)
+
+    result = update_cache(args.log_dir, args.db, args.jobs, args.force)
+    print("[INFO] 세션 {total}개: 처리 {processed}, 건너뜀 {skipped}, 실패 {failed}, 제거 {removed}".format(**result))
+
+    if args.top:
+        for r in top_sessions(args.top, args.db):
+            pcts = json.loads(r["pcts"])
+            print(f"{os.path.basename(r['path'])}  {r['started']}  {r['duration_s'] / 60:6.1f}min  "
+                  f"max={r['max']:.2f}  " + "  ".join(f"p{k}={v:.2f}" for k, v in pcts.items()))
+        return
+
+    conn = open_db(args.db)
+    conn.row_factory = sqlite3.Row
+    for r in conn.execute("SELECT * FROM sessions ORDER BY started"):
+        warn = json.loads(r["warnings"] or "{}")
+        warn_text = ", ".join(f"{k}({v['duration_s']:.1f}s)" for k, v in warn.items()) or "-"
+        print(f"{os.path.basename(r['path'])}  {r['started']}  {r['duration_s'] / 60:6.1f}min  "
+              f"{r['distance_km']:7.2f}km  경고: {warn_text}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+슬롯 인덱스 기반 최신값 저장소
+- 채널 이름 → 슬롯 번호를 생성 시 고정(dict 재할당 없음)
+- 값/타임스탬프는 미리 할당한 array('d')에 인덱스로 저장
+- 쓰기는 시퀀스 카운터(seqlock 방식)로 감싸고, 읽기는 락 없이
+  재사용 버퍼(Snapshot)에 일관된 스냅샷을 복사
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+from .config import ALL_CHANNELS
+
+
+def _to_py(v: float) -> Any:
+    """정수값은 int로 돌려 CSV/JSON 표기를 기존과 같게 유지"""
+    return int(v) if v.is_integer() else v
+
+
+class Snapshot:
+    """StateStore.snapshot()이 채우는 재사용 버퍼"""
+    __slots__ = ("channels", "slot", "values", "stamps", "seq")
+
+    def __init__(self, channels: Sequence[str], slot: Mapping[str, int]):
+        n = len(channels)
+        self.channels = channels
+        self.slot = slot
+        self.values = array("d", [math.nan]) * n
+        self.stamps = array("d", [0.0]) * n
+        self.seq = 0
+
+    def has(self, name: str) -> bool:
+        i = self.slot.get(name)
+        return i is not None and self.stamps[i] > 0.0
+
+    def get(self, name: str, default: Any = None) -> Any:
+        i = self.slot.get(name)
+        if i is None or self.stamps[i] <= 0.0:
+            return default
+        return _to_py(self.values[i])
+
+    def age(self, name: str, now: Optional[float] = None) -> float:
+        """마지막 갱신 후 경과 시간(초). 한 번도 갱신되지 않았으면 inf"""
+        i = self.slot.get(name)
+        if i is None or self.stamps[i] <= 0.0:
+            return math.inf
+        return (now if now is not None else time.time()) - self.stamps[i]
+
+    def items(self, names: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Any]]:
+        """값이 있는 채널만 (이름, 값)으로 순회"""
+        stamps, values, slot = self.stamps, self.values, self.slot
+        if names is None:
+            for i, name in enumerate(self.channels):
+                if stamps[i] > 0.0:
+                    yield name, _to_py(values[i])
+            return
+        for name in names:
+            i = slot.get(name)
+            if i is not None and stamps[i] > 0.0:
+                yield name, _to_py(values[i])
+
+    def to_dict(self, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return dict(self.items(names))
+
+    def row(self) -> Iterator[Any]:
+        """슬롯 순서대로 값(없으면 빈 문자열) — csv.writer 용"""
+        stamps, values = self.stamps, self.values
+        for i in range(len(values)):
+            yield _to_py(values[i]) if stamps[i] > 0.0 else ""
+
+
+class StateStore:
+    """
+    - 고정 채널 목록에 대한 최신값 저장소
+    - update()는 여러 워커 스레드에서 호출 가능(쓰기끼리는 락으로 직렬화)
+    - snapshot()은 쓰기 도중이면 재시도하여 찢어지지 않은 값을 복사
+    """
+    def __init__(self, channels: Sequence[str] = ALL_CHANNELS):
+        self.channels = tuple(channels)
+        self.slot = {name: i for i, name in enumerate(self.channels)}
+        n = len(self.channels)
+        self._values = array("d", [math.nan]) * n
+        self._stamps = array("d", [0.0]) * n
+        self._seq = 0
+        self._write_lock = threading.Lock()
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def update(self, parsed: Mapping[str, Any], ts: Optional[float] = None) -> None:
+        """파싱 결과를 슬롯에 기록. 모르는 키/숫자가 아닌 값은 무시"""
+        now = ts if ts is not None else time.time()
+        slot, values, stamps = self.slot, self._values, self._stamps
+        with self._write_lock:
+            self._seq += 1  # 홀수 = 쓰기 중
+            try:
+                for name, v in parsed.items():
+                    i = slot.get(name)
+                    if i is None or v is None:
+                        continue
+                    try:
+                        values[i] = float(v)
+                    except (TypeError, ValueError):
+                        continue
+                    stamps[i] = now
+            finally:
+                self._seq += 1
+
+    def snapshot(self, out: Optional[Snapshot] = None) -> Snapshot:
+        """일관된 스냅샷을 out(없으면 새 버퍼)에 복사해 반환"""
+        if out is None:
+            out = Snapshot(self.channels, self.slot)
+        while True:
+            start = self._seq
+            if start & 1:
+                time.sleep(0)  # 쓰기 스레드에 양보
+                continue
+            out.values[:] = self._values
+            out.stamps[:] = self._stamps
+            if self._seq == start:
+                out.seq = start
+                return out
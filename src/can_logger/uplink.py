@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+업링크 품질 추정 및 업로드 정책
+- FirebaseClient의 실제 요청 결과로 RTT/성공률을 EWMA 추정
+- 처리량은 최근 요청들의 RTT 를 본문 크기에 회귀해 지연과 분리(작은 패치로도 측정)
+- 업로드가 없을 때만 가벼운 TCP 프로브로 링크 상태 확인
+- 등급(good/fair/poor/down)에 따라 업로드 주기 배율과 채널 우선순위 결정
+- 측정된 처리량이 있을 때만 페이로드 크기 예산을 잡고, 넘치면 낮은 우선순위부터 제외
+  (good 등급에서는 제외하지 않음)
+"""
+
+import json
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from .config import (
+    UPLINK_PROBE_ADDR, UPLINK_EWMA_ALPHA, UPLINK_BUDGET_FRACTION,
+    UPLINK_THROUGHPUT_WINDOW_SEC, UPLINK_THROUGHPUT_MIN_SAMPLES, UPLINK_THROUGHPUT_MIN_SPREAD,
+    UPLINK_TIERS, CHANNEL_PRIORITY,
+)
+
+
+class UplinkPolicy(NamedTuple):
+    tier: str
+    rate_scale: float
+    max_priority: int
+
+
+class UplinkManager:
+    def __init__(self, alpha: float = UPLINK_EWMA_ALPHA):
+        self.alpha = alpha
+        self.rtt_s: Optional[float] = None
+        self.success_rate = 1.0
+        self.throughput_bps: Optional[float] = None  # bytes/s (None = 측정된 제한 없음)
+        self._samples: deque = deque(maxlen=256)  # (시각, 바이트, RTT)
+        self.consecutive_failures = 0
+        self.last_activity = 0.0
+        self._lock = threading.Lock()
+        self._fields_cache: Dict[Tuple[Tuple[str, ...], int], Tuple[str, ...]] = {}
+
+    # ---------- 측정 ----------
+    def record(self, ok: bool, rtt_s: float, nbytes: int = 0):
+        """요청 1건의 결과 반영 (FirebaseClient on_result 콜백)"""
+        a = self.alpha
+        with self._lock:
+            self.last_activity = time.time()
+            self.success_rate += a * ((1.0 if ok else 0.0) - self.success_rate)
+            if not ok:
+                self.consecutive_failures += 1
+                return
+            self.consecutive_failures = 0
+            self.rtt_s = rtt_s if self.rtt_s is None else self.rtt_s + a * (rtt_s - self.rtt_s)
+            if nbytes > 0:
+                self._samples.append((self.last_activity, nbytes, rtt_s))
+                self._update_throughput()
+
+    def _update_throughput(self):
+        """
+        윈도 내 RTT = 지연 + 바이트/처리량 으로 최소제곱 회귀 (락 안에서 호출)
+        - nbytes/rtt 를 그대로 쓰면 지연이 지배적인 작은 요청에서 페이로드 크기를 따라가므로
+          줄인 페이로드가 다시 예산을 줄이는 되먹임이 생김 → 기울기만 사용
+        """
+        samples = self._samples
+        cutoff = self.last_activity - UPLINK_THROUGHPUT_WINDOW_SEC
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        n = len(samples)
+        if n < UPLINK_THROUGHPUT_MIN_SAMPLES:
+            return
+        sizes = [s[1] for s in samples]
+        if max(sizes) - min(sizes) < UPLINK_THROUGHPUT_MIN_SPREAD:
+            return
+        mx = sum(sizes) / n
+        my = sum(s[2] for s in samples) / n
+        sxx = sum((x - mx) ** 2 for x in sizes)
+        sxy = sum((s[1] - mx) * (s[2] - my) for s in samples)
+        # 크기에 따라 RTT 가 늘지 않으면 대역폭 제한이 관측되지 않은 것
+        self.throughput_bps = sxx / sxy if sxy > 0 else None
+
+    def idle_for(self) -> float:
+        return time.time() - self.last_activity
+
+    def probe(self, addr: Tuple[str, int] = UPLINK_PROBE_ADDR, timeout: float = 2.0) -> bool:
+        """TCP 연결 시간으로 RTT 측정(처리량은 갱신하지 않음)"""
+        t0 = time.monotonic()
+        try:
+            socket.create_connection(addr, timeout=timeout).close()
+        except OSError:
+            self.record(False, time.monotonic() - t0)
+            return False
+        self.record(True, time.monotonic() - t0)
+        return True
+
+    # ---------- 정책 ----------
+    def tier(self) -> str:
+        if self.consecutive_failures >= 3 or self.success_rate < 0.2:
+            return "down"
+        rtt = self.rtt_s or 0.0
+        if rtt > 1.0 or self.success_rate < 0.7:
+            return "poor"
+        if rtt > 0.3 or self.success_rate < 0.95:
+            return "fair"
+        return "good"
+
+    def link_up(self) -> bool:
+        return self.tier() != "down"
+
+    def policy(self) -> UplinkPolicy:
+        tier = self.tier()
+        return UplinkPolicy(tier=tier, **UPLINK_TIERS[tier])
+
+    def fields(self, names: Tuple[str, ...], max_priority: int) -> Tuple[str, ...]:
+        """우선순위 상한 이하 채널만 (채널 묶음별 캐시)"""
+        key = (names, max_priority)
+        cached = self._fields_cache.get(key)
+        if cached is None:
+            cached = tuple(n for n in names if CHANNEL_PRIORITY.get(n, 3) <= max_priority)
+            self._fields_cache[key] = cached
+        return cached
+
+    def byte_budget(self, interval: float) -> Optional[int]:
+        if self.throughput_bps is None:
+            return None
+        return int(self.throughput_bps * interval * UPLINK_BUDGET_FRACTION)
+
+    def trim(
+        self,
+        payload: Dict[str, Any],
+        interval: float,
+        keep: Iterable[str] = ("timestamp",),
+        encode: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        추정 처리량 예산을 넘으면 낮은 우선순위 채널부터 제외(우선순위 1은 유지)
+        encode: 실제 전송 본문을 만드는 함수(멀티 경로 등) — 크기는 그 결과로 계산
+        """
+        budget = self.byte_budget(interval)
+        if budget is None or self.tier() == "good":
+            return payload
+        size = (lambda p: len(json.dumps(encode(p)))) if encode else (lambda p: len(json.dumps(p)))
+        keep = set(keep)
+        level = max((CHANNEL_PRIORITY.get(k, 3) for k in payload if k not in keep), default=1)
+        while level > 1 and size(payload) > budget:
+            payload = {k: v for k, v in payload.items()
+                       if k in keep or CHANNEL_PRIORITY.get(k, 3) < level}
+            level -= 1
+        return payload
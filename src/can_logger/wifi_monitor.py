@@ -2,17 +2,32 @@
 
 import socket
 import threading
+from typing import Optional
 from .gpio_ctrl import GpioController
+from .uplink import UplinkManager
+from .config import UPLINK_PROBE_ADDR, UPLINK_PROBE_IDLE_SEC
 
-def start_wifi_monitor(gpio: GpioController, stop_event: threading.Event) -> threading.Thread:
+def start_wifi_monitor(
+    gpio: GpioController,
+    stop_event: threading.Event,
+    uplink: Optional[UplinkManager] = None
+) -> threading.Thread:
     def _loop():
         while not stop_event.is_set():
-            try:
-                socket.create_connection(("8.8.8.8", 53), timeout=2)
-                gpio.set_wifi_led(True)
-            except OSError:
-                gpio.set_wifi_led(False)
-            stop_event.wait(10)
+            if uplink is None:
+                try:
+                    socket.create_connection(UPLINK_PROBE_ADDR, timeout=2).close()
+                    gpio.set_wifi_led(True)
+                except OSError:
+                    gpio.set_wifi_led(False)
+                stop_event.wait(10)
+                continue
+
+            # 실제 업로드가 있으면 그 결과로 충분 → 유휴일 때만 프로브
+            if uplink.idle_for() > UPLINK_PROBE_IDLE_SEC:
+                uplink.probe()
+            gpio.set_wifi_led(uplink.link_up())
+            stop_event.wait(1.0)
     t = threading.Thread(target=_loop, daemon=True)
     t.start()
     return t
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import math
+from array import array
+
+import pytest
+
+from can_logger.config import DERIVED_CHANNELS
+from can_logger.derived import DerivedEngine, apply_to_columns
+
+GPS_ACCEL = [s for s in DERIVED_CHANNELS if s["name"] == "GPS_LongAccel_g"]
+LONG_G = [s for s in DERIVED_CHANNELS if s["name"] == "LongG"]
+FUEL_RATE = [s for s in DERIVED_CHANNELS if s["name"] == "FuelRate_Lph"]
+
+
+def test_batch_matches_realtime_for_held_csv_values():
+    # 0.102 g 등가속, GPS 1Hz 갱신, CSV 20Hz 행(마지막 값 반복)
+    accel_kmh_s = 0.102 * 9.80665 * 3.6
+    engine = DerivedEngine(GPS_ACCEL)
+    realtime = {}
+    for sec in range(10):
+        out = engine.update({"GPS_Speed_KPH": 20 + accel_kmh_s * sec}, float(sec))
+        realtime.update(out)
+
+    ts = array("d", (i * 0.05 for i in range(200)))
+    speed = array("d", (20 + accel_kmh_s * math.floor(t + 1e-9) for t in ts))
+    batch = apply_to_columns({"GPS_Speed_KPH": speed}, ts, GPS_ACCEL)["GPS_LongAccel_g"]
+
+    assert realtime["GPS_LongAccel_g"] == pytest.approx(0.102, rel=1e-3)
+    valid = [v for v in batch if not math.isnan(v)]
+    assert max(valid) == pytest.approx(0.102, rel=1e-3)
+    assert min(valid) == pytest.approx(0.102, rel=1e-3)
+
+
+def test_rate_decays_after_input_stops_changing():
+    engine = DerivedEngine(GPS_ACCEL)
+    engine.update({"GPS_Speed_KPH": 36.0}, 0.0)
+    engine.update({"GPS_Speed_KPH": 0.0}, 1.0)
+    out = {}
+    for sec in range(2, 12):
+        out.update(engine.update({"GPS_Speed_KPH": 0.0}, float(sec)))
+    assert abs(out["GPS_LongAccel_g"]) < 0.01
+
+
+def test_lowpass_does_not_depend_on_update_rate():
+    def run(hz):
+        engine = DerivedEngine(LONG_G)
+        out = {}
+        engine.update({"ax_g": 0.0, "ay_g": 0.0}, 0.0)
+        for i in range(1, int(0.2 * hz) + 1):
+            # 값이 매번 바뀌도록 아주 작은 노이즈
+            out.update(engine.update({"ax_g": 1.0 + (i % 2) * 1e-9, "ay_g": 0.0}, i / hz))
+        return out["LongG"]
+
+    assert run(1000) == pytest.approx(run(20), abs=0.02)
+
+
+@pytest.mark.parametrize("lph", [0.5, 1.0, 5.0])
+def test_quantised_counter_at_low_flow(lph):
+    # 0.01L 단위 카운터, 20Hz 수신 — hold 계산이 기준점을 옮기면 튀었다가 0으로 떨어짐
+    ts = array("d", (i * 0.05 for i in range(20 * 600)))
+    used = array("d", (math.floor(t * lph / 3600 / 0.01 + 1e-9) * 0.01 for t in ts))
+    engine = DerivedEngine(FUEL_RATE)
+    realtime = []
+    for t, v in zip(ts, used):
+        out = engine.update({"FuelUsed_L": v}, t)
+        if t > 200 and "FuelRate_Lph" in out:
+            realtime.append(out["FuelRate_Lph"])
+    batch = apply_to_columns({"FuelUsed_L": used}, ts, FUEL_RATE)["FuelRate_Lph"]
+
+    for values in (realtime, [v for t, v in zip(ts, batch) if t > 200]):
+        assert min(values) == pytest.approx(lph, rel=0.15)
+        assert max(values) == pytest.approx(lph, rel=0.15)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from can_logger.config import (
+    REALTIME_SLOW_RETRY_SEC, REALTIME_TICK_SEC, REALTIME_MIRROR_INTERVAL, UPLINK_TIERS,
+)
+from can_logger.realtime import RealtimeScheduler
+from can_logger.state_store import StateStore
+from can_logger.uplink import UplinkManager, UplinkPolicy
+
+GOOD = UplinkPolicy(tier="good", **UPLINK_TIERS["good"])
+FAIR = UplinkPolicy(tier="fair", **UPLINK_TIERS["fair"])
+TS = "2026-01-01 12:00:00.000"
+
+
+def _setup(mirror=False):
+    store = StateStore()
+    store.update({"RPM": 3000, "Batt_V": 13.8, "Gear": 2, "CEL_Error": 0}, ts=1.0)
+    return store, RealtimeScheduler(UplinkManager(), mirror=mirror)
+
+
+def _tick(store, scheduler, now, policy=GOOD, ok=True):
+    sends = scheduler.plan(store.snapshot(), now, TS, policy)
+    for send in sends:
+        scheduler.done(send, ok, now, policy)
+    return {s.group: s for s in sends}
+
+
+def test_periodic_groups_scale_with_link_tier():
+    store, scheduler = _setup()
+    assert set(_tick(store, scheduler, 0.0, FAIR)) == {"fast", "medium", "slow"}
+    assert "fast" not in _tick(store, scheduler, 0.2, FAIR)  # 0.1s * 2.5
+    assert "fast" in _tick(store, scheduler, 0.25, FAIR)
+    assert "medium" not in _tick(store, scheduler, 2.0, FAIR)
+    assert "medium" in _tick(store, scheduler, 2.5, FAIR)
+
+
+def test_slow_group_sends_only_changes():
+    store, scheduler = _setup()
+    first = _tick(store, scheduler, 0.0)["slow"]
+    assert first.data == {"Gear": 2, "CEL_Error": 0, "timestamp": TS}
+    assert "slow" not in _tick(store, scheduler, 1.0)
+
+    store.update({"Gear": 3}, ts=2.0)
+    assert _tick(store, scheduler, 2.0)["slow"].data == {"Gear": 3, "timestamp": TS}
+    assert first.body == {"emu_realtime/slow/Gear": 2, "emu_realtime/slow/CEL_Error": 0,
+                          "emu_realtime/slow/timestamp": TS}
+
+
+def test_slow_group_resends_after_failed_patch():
+    store, scheduler = _setup()
+    assert "slow" in _tick(store, scheduler, 0.0, ok=False)
+    assert "slow" not in _tick(store, scheduler, REALTIME_SLOW_RETRY_SEC - REALTIME_TICK_SEC)
+    retry = _tick(store, scheduler, REALTIME_SLOW_RETRY_SEC)["slow"]
+    assert retry.data == {"Gear": 2, "CEL_Error": 0, "timestamp": TS}
+    assert "slow" not in _tick(store, scheduler, REALTIME_SLOW_RETRY_SEC + 1.0)
+
+
+def test_legacy_mirror_is_throttled_and_merged():
+    store, scheduler = _setup(mirror=True)
+    mirrored = []
+    for i in range(10):
+        now = i * 0.1
+        for send in _tick(store, scheduler, now).values():
+            if send.mirror:
+                mirrored.append((round(now, 1), send.group, set(send.mirror)))
+    # 0.2s 마다 한 요청에만, 직전 미러 이후 모든 그룹의 값을 모아서
+    assert [m[0] for m in mirrored] == [round(k * REALTIME_MIRROR_INTERVAL, 1) for k in range(5)]
+    assert {"RPM", "Batt_V", "Gear", "CEL_Error"} <= mirrored[0][2]
+    assert all(m[2] == {"RPM", "timestamp"} for m in mirrored[1:])
+
+
+def test_mirror_dropped_before_channels_on_weak_link():
+    store, scheduler = _setup(mirror=True)
+    store.update({"MAP_kPa": 95, "TPS_percent": 40.0}, ts=1.0)
+    uplink = scheduler.uplink
+    uplink.record(True, 0.5)                    # fair 등급
+    uplink.throughput_bps = 1000.0              # fast 예산: 0.1s * 0.5 → 50B (우선순위 1만 남음)
+    fast = _tick(store, scheduler, 0.0, FAIR)["fast"]
+    assert fast.mirror == {}
+    assert not any(k.startswith("emu_realtime_data/") for k in fast.body)
+
+    uplink.throughput_bps = 6000.0              # 예산 300B: 채널(~160B)은 모두 들어가지만 미러(~420B)까지는 못 실음
+    fast = _tick(store, scheduler, 1.0, FAIR)["fast"]
+    assert fast.mirror == {}
+    assert set(fast.data) == {"RPM", "TPS_percent", "MAP_kPa", "timestamp"}
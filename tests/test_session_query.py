@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import csv
+from datetime import datetime, timedelta
+
+from can_logger.session_index import SessionIndexWriter
+from can_logger.session_query import query
+
+
+def _write_session(path, n_rows, close_index):
+    columns = ["Timestamp", "RPM"]
+    t0 = datetime(2026, 1, 1, 12, 0, 0)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(columns)
+        index = SessionIndexWriter(path, columns, key_channels=("RPM",), block_rows=100)
+        for i in range(n_rows):
+            now = t0 + timedelta(milliseconds=50 * i)
+            index.add_row(f, now.timestamp(), {"RPM": i})
+            w.writerow([now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], i])
+        if close_index:
+            index.close()
+        else:
+            f.write("2026-01-01 12:00:")  # 전원 차단으로 잘린 마지막 줄
+    return index
+
+
+def test_query_after_power_cut_includes_unindexed_tail(tmp_path):
+    path = str(tmp_path / "datalog_cut.csv")
+    _write_session(path, 250, close_index=False)
+    _, rows = query(path, where=["RPM >= 190"])
+    assert [int(r[1]) for r in rows] == list(range(190, 250))
+
+
+def test_query_on_closed_index(tmp_path):
+    path = str(tmp_path / "datalog_ok.csv")
+    _write_session(path, 250, close_index=True)
+    _, rows = query(path, "2026-01-01 12:00:10", "2026-01-01 12:00:11")
+    assert [int(r[1]) for r in rows] == list(range(200, 221))
+
+
+def test_query_skips_truncated_row_inside_indexed_block(tmp_path):
+    path = str(tmp_path / "datalog_cut_block.csv")
+    columns = ["Timestamp", "RPM"]
+    t0 = datetime(2026, 1, 1, 12, 0, 0)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(columns)
+        index = SessionIndexWriter(path, columns, key_channels=("RPM",), block_rows=100)
+        for i in range(100):
+            now = t0 + timedelta(milliseconds=50 * i)
+            index.add_row(f, now.timestamp(), {"RPM": i})
+            if i < 99:
+                w.writerow([now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], i])
+        # 100번째 행은 인덱스(블록 기록)까지 반영된 뒤 CSV 쓰기 도중 전원 차단
+        f.write("2026")
+    _, rows = query(path, "2026-01-01 12:00:00", "2026-01-01 12:00:10")
+    assert [int(r[1]) for r in rows] == list(range(99))
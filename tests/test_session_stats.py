@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import math
+import os
+import random
+from datetime import datetime, timedelta
+
+from can_logger.session_stats import _ChannelStats, update_cache
+
+
+def _write_log(path, n_rows=200):
+    t0 = datetime(2026, 1, 1, 12, 0, 0)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Timestamp", "RPM", "OilPressure_bar"])
+        for i in range(n_rows):
+            ts = (t0 + timedelta(milliseconds=50 * i)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            w.writerow([ts, 3000 + i * 20, 3.0])
+
+
+def test_touched_but_unchanged_file_is_not_reanalysed(tmp_path):
+    log = tmp_path / "datalog_a.csv"
+    db = str(tmp_path / "stats.sqlite3")
+    _write_log(str(log))
+    assert update_cache(str(tmp_path), db, jobs=1)["processed"] == 1
+
+    st = os.stat(log)
+    os.utime(log, (st.st_atime, st.st_mtime + 60))
+    result = update_cache(str(tmp_path), db, jobs=1)
+    assert result["processed"] == 0
+    assert result["unchanged_touched"] == 1
+    # mtime 이 갱신되어 다음 실행은 해시 계산 없이 건너뜀
+    assert update_cache(str(tmp_path), db, jobs=1)["unchanged_touched"] == 0
+
+    with open(log, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(["2026-01-01 12:00:10.000", 9000, 1.0])
+    assert update_cache(str(tmp_path), db, jobs=1)["processed"] == 1
+
+
+def test_channel_percentiles_within_sketch_accuracy():
+    rng = random.Random(1)
+    values = [rng.uniform(-50, 9000) for _ in range(20000)] + [0.0] * 100
+    cs = _ChannelStats(accuracy=0.01)
+    for v in values:
+        cs.add(v)
+    s = sorted(values)
+    for p in (50, 95, 99):
+        exact = s[math.ceil(p / 100 * len(s)) - 1]
+        assert abs(cs.percentile(p) - exact) <= 0.01 * abs(exact) + 1e-9
+    assert (cs.min, cs.max) == (s[0], s[-1])
+    assert len(cs._pos) + len(cs._neg) < 1000
+
+
+def test_other_log_dir_does_not_prune_cached_sessions(tmp_path):
+    db = str(tmp_path / "stats.sqlite3")
+    main_dir, other_dir = tmp_path / "logs", tmp_path / "other"
+    main_dir.mkdir()
+    other_dir.mkdir()
+    _write_log(str(main_dir / "datalog_a.csv"))
+    _write_log(str(other_dir / "datalog_b.csv"))
+    assert update_cache(str(main_dir), db, jobs=1)["processed"] == 1
+    assert update_cache(str(other_dir), db, jobs=1)["removed"] == 0
+    assert update_cache(str(main_dir), db, jobs=1)["processed"] == 0
+
+    os.remove(main_dir / "datalog_a.csv")
+    assert update_cache(str(main_dir), db, jobs=1)["removed"] == 1
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import threading
+
+from can_logger.state_store import StateStore, _to_py
+
+
+def test_update_ignores_unknown_and_non_numeric():
+    store = StateStore(("RPM", "CLT_C"))
+    store.update({"RPM": "3500", "CLT_C": "n/a", "Foo": 1.0, "Bar": None}, ts=10.0)
+    snap = store.snapshot()
+    assert snap.get("RPM") == 3500
+    assert not snap.has("CLT_C")
+    assert snap.get("CLT_C", -1) == -1
+    assert snap.get("Foo") is None
+    assert snap.to_dict() == {"RPM": 3500}
+
+
+def test_row_follows_slot_order_with_blank_cells():
+    store = StateStore(("RPM", "CLT_C", "Batt_V"))
+    store.update({"Batt_V": 13.8, "RPM": 3000.0}, ts=1.0)
+    assert list(store.snapshot().row()) == [3000, "", 13.8]
+
+
+def test_to_py_keeps_integer_formatting():
+    assert _to_py(3000.0) == 3000 and isinstance(_to_py(3000.0), int)
+    assert _to_py(-2.0) == -2 and isinstance(_to_py(-2.0), int)
+    assert _to_py(13.8) == 13.8 and isinstance(_to_py(13.8), float)
+
+
+def test_snapshot_reuses_buffer():
+    store = StateStore(("RPM",))
+    snap = store.snapshot()
+    values, stamps = snap.values, snap.stamps
+    store.update({"RPM": 1000}, ts=5.0)
+    assert store.snapshot(snap) is snap
+    assert snap.values is values and snap.stamps is stamps
+    assert snap.get("RPM") == 1000
+    assert snap.age("RPM", now=7.5) == 2.5
+    assert snap.seq == store.seq
+
+
+def test_snapshot_is_never_torn():
+    store = StateStore(("a", "b"))
+    stop = threading.Event()
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            n += 1
+            store.update({"a": n, "b": n})
+
+    t = threading.Thread(target=writer, daemon=True)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # 쓰기 도중 스레드 전환이 자주 일어나도록
+    t.start()
+    snap = store.snapshot()
+    try:
+        seen = set()
+        for _ in range(20000):
+            store.snapshot(snap)
+            a, b = snap.get("a"), snap.get("b")
+            assert a == b
+            seen.add(a)
+    finally:
+        stop.set()
+        t.join()
+        sys.setswitchinterval(interval)
+    assert len(seen) > 1  # 쓰기와 실제로 겹쳐서 읽었는지
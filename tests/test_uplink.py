@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from can_logger.config import CHANNEL_PRIORITY, REALTIME_GROUPS
+from can_logger.uplink import UplinkManager
+
+
+def _payload(group):
+    data = {name: 1234.5678 for name in REALTIME_GROUPS[group]["channels"]}
+    data["timestamp"] = "2026-01-01 12:00:00.000"
+    return data
+
+
+def _multipath(group):
+    def encode(d):
+        out = {f"emu_realtime/{group}/{k}": v for k, v in d.items()}
+        out.update({f"emu_realtime_data/{k}": v for k, v in d.items()})
+        return out
+    return encode
+
+
+def _run_link(uplink, latency_s, bytes_per_s, rounds=40):
+    """fast(0.1s)/medium(1.0s) 그룹을 번갈아 보내며 RTT = 지연 + 크기/대역폭 으로 응답"""
+    sent = {}
+    for _ in range(rounds):
+        for group, interval in (("fast", 0.1), ("medium", 1.0)):
+            encode = _multipath(group)
+            sent[group] = uplink.trim(_payload(group), interval, encode=encode)
+            nbytes = len(json.dumps(encode(sent[group])))
+            uplink.record(True, latency_s + nbytes / bytes_per_s, nbytes)
+    return sent
+
+
+def test_good_link_keeps_every_field():
+    uplink = UplinkManager()
+    # 200ms RTT, 크기와 무관한 지연 → 처리량 제한이 관측되지 않아야 함
+    sent = _run_link(uplink, 0.2, 1e9)
+    assert uplink.tier() == "good"
+    assert sent == {"fast": _payload("fast"), "medium": _payload("medium")}
+
+
+def test_trim_from_measured_realtime_patches():
+    uplink = UplinkManager()
+    # 350ms 지연(fair), 6kB/s — 실제 패치 크기(약 0.3~3.4kB)만으로 추정
+    sent = _run_link(uplink, 0.35, 6000.0)
+    assert uplink.tier() == "fair"
+    assert uplink.throughput_bps == pytest.approx(6000.0, rel=0.05)
+    # fast(0.1s 예산 ~300B)는 우선순위 1만, medium(1s 예산 ~3kB)은 우선순위 3만 제외
+    assert {CHANNEL_PRIORITY.get(k, 3) for k in sent["fast"] if k != "timestamp"} == {1}
+    assert {CHANNEL_PRIORITY.get(k, 3) for k in sent["medium"] if k != "timestamp"} == {1, 2}
+    # 줄인 페이로드가 추정치를 다시 줄이지 않음(되먹임 없음)
+    again = _run_link(uplink, 0.35, 6000.0)
+    assert again == sent
+
+
+def test_trim_uses_encoded_size_on_weak_link():
+    uplink = UplinkManager()
+    _run_link(uplink, 0.5, 2000.0, rounds=10)
+    payload = _payload("fast")
+    plain = uplink.trim(payload, 0.5)
+    encoded = uplink.trim(payload, 0.5, encode=_multipath("fast"))
+    assert len(encoded) < len(plain) <= len(payload)
+    assert "RPM" in encoded and "timestamp" in encoded